@@ -0,0 +1,109 @@
+import argparse
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import report, run_stage
+from benchmarks.generate_clippings import generate_clippings
+from src.cli.main import KindleClippingsProcessor
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the stages of src/cli/main.py on a synthetic 'My Clippings.txt'."
+    )
+    parser.add_argument("--books", type=int, default=50)
+    parser.add_argument("--highlights_per_book", type=int, default=2000)
+    parser.add_argument("--overlap_rate", type=float, default=0.2)
+    parser.add_argument("--note_rate", type=float, default=0.1)
+    parser.add_argument("--bookmark_rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "-w", "--workers", type=int, default=None, help="Processes for read_clippings_parallel."
+    )
+    parser.add_argument("-f", "--format_style", choices=["bullet", "default"], default="default")
+    parser.add_argument("--no_memory", action="store_true", help="Skip the tracemalloc runs.")
+    parser.add_argument("--json", type=Path, default=None, help="Write the results as JSON.")
+    args = parser.parse_args()
+    measure_memory = not args.no_memory
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "My Clippings.txt"
+        output_path = Path(temp_dir) / "Cleaned Clippings.txt"
+        entries = generate_clippings(
+            input_path,
+            args.books,
+            args.highlights_per_book,
+            args.overlap_rate,
+            args.note_rate,
+            args.bookmark_rate,
+            args.seed,
+        )
+        processor = KindleClippingsProcessor(input_path)
+        results = []
+
+        clippings, result = run_stage(
+            "read_clippings", processor.read_clippings, entries, measure_memory
+        )
+        results.append(result)
+
+        def read_clippings_parallel():
+            processor.PARALLEL_MIN_SIZE = 0
+            return processor.read_clippings_parallel(args.workers)
+
+        _, result = run_stage(
+            "read_clippings_parallel", read_clippings_parallel, entries, measure_memory
+        )
+        results.append(result)
+
+        def remove_duplicates():
+            processor.book_highlights = {}
+            return processor.remove_duplicates(clippings)
+
+        cleaned_clippings, result = run_stage(
+            "remove_duplicates", remove_duplicates, len(clippings), measure_memory
+        )
+        results.append(result)
+
+        _, result = run_stage(
+            "remove_near_duplicates",
+            lambda: processor.remove_near_duplicates(cleaned_clippings),
+            len(cleaned_clippings),
+            measure_memory,
+        )
+        results.append(result)
+
+        _, result = run_stage(
+            "list_books", lambda: processor.list_books(clippings), len(clippings), measure_memory
+        )
+        results.append(result)
+
+        formatted_clippings, result = run_stage(
+            "apply_formatting",
+            lambda: processor.apply_formatting(cleaned_clippings, args.format_style),
+            len(cleaned_clippings),
+            measure_memory,
+        )
+        results.append(result)
+
+        _, result = run_stage(
+            "save_cleaned_clippings",
+            lambda: processor.save_cleaned_clippings(output_path, formatted_clippings),
+            len(cleaned_clippings),
+            measure_memory,
+        )
+        results.append(result)
+
+        _, result = run_stage(
+            "write_clippings",
+            lambda: processor.write_clippings(output_path, cleaned_clippings, args.format_style),
+            len(cleaned_clippings),
+            measure_memory,
+        )
+        results.append(result)
+
+        size = input_path.stat().st_size / 2**20
+        report(f"{entries} clippings, {args.books} books, {size:.1f} MiB", results, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import report, run_stage
+from benchmarks.generate_csv import generate_csv
+from src.cli.main_external_csv import ClippingProcessor, MarkdownExporter
+
+
+def benchmark(
+    csv_path: Path, output_path: Path, rows: int, chunksize: int, measure_memory: bool
+) -> list:
+    """
+    Times every stage of the CSV pipeline on its own input. The chunked deduplication reads a fixed
+    number of rows per chunk, so its rate stays flat across sizes as long as it grows linearly
+    with the number of chunks.
+    """
+    results = []
+
+    raw_df, result = run_stage(
+        "read_csv", lambda: ClippingProcessor.read_csv(csv_path), rows, measure_memory
+    )
+    results.append(result)
+
+    processor = ClippingProcessor(csv_path)
+    cache_path = ClippingProcessor.default_cache_path(csv_path)
+    _, result = run_stage(
+        "read_cached (cold)",
+        lambda: processor.read_cached(csv_path, cache_path),
+        rows,
+        measure_memory=False,
+    )
+    results.append(result)
+
+    _, result = run_stage(
+        "read_cached (warm)",
+        lambda: processor.read_cached(csv_path, cache_path),
+        rows,
+        measure_memory,
+    )
+    results.append(result)
+
+    def remove_duplicates():
+        processor.df = raw_df.copy()
+        return processor.remove_duplicates()
+
+    deduped_df, result = run_stage("remove_duplicates", remove_duplicates, rows, measure_memory)
+    results.append(result)
+
+    chunked_processor = ClippingProcessor(csv_path, chunksize=chunksize)
+    _, result = run_stage(
+        "remove_duplicates (chunked)",
+        chunked_processor.remove_duplicates,
+        rows,
+        measure_memory,
+    )
+    results.append(result)
+
+    categorized_df, result = run_stage(
+        "categorize_notes",
+        lambda: processor.categorize_notes(deduped_df.copy()),
+        len(deduped_df),
+        measure_memory,
+    )
+    results.append(result)
+
+    _, result = run_stage(
+        "MarkdownExporter.export",
+        lambda: MarkdownExporter(categorized_df, output_path).export(),
+        len(categorized_df),
+        measure_memory,
+    )
+    results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the stages of src/cli/main_external_csv.py on synthetic exports."
+    )
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--books", type=int, default=20)
+    parser.add_argument("--overlap_rate", type=float, default=0.2)
+    parser.add_argument("--note_rate", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--chunksize", type=int, default=5_000, help="Rows per chunk of the chunked deduplication."
+    )
+    parser.add_argument("--no_memory", action="store_true", help="Skip the tracemalloc runs.")
+    parser.add_argument(
+        "--json_dir", type=Path, default=None, help="Write the results of every size as JSON."
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for rows in args.rows:
+            csv_path = Path(temp_dir) / f"clippings_{rows}.csv"
+            generate_csv(csv_path, rows, args.books, args.overlap_rate, args.note_rate, args.seed)
+            results = benchmark(
+                csv_path,
+                Path(temp_dir) / "exported_notes.md",
+                rows,
+                args.chunksize,
+                not args.no_memory,
+            )
+            json_path = args.json_dir / f"bench_csv_{rows}.json" if args.json_dir else None
+            report(f"{rows} rows, {args.books} books", results, json_path)
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import random
+import timeit
+from typing import Optional, Tuple
+
+from src.cli.main import KindleClippingsProcessor
+
+LOCATION_IDENTIFIER = KindleClippingsProcessor.LOCATION_IDENTIFIER
+ENGLISH = KindleClippingsProcessor.LOCALES[0]
+
+
+def split_location(entry: str) -> Optional[Tuple[int, int]]:
+    """The previous parser: find the location line, then split it down to the range."""
+    lines = entry.split("\n")
+    line = next((line for line in lines if LOCATION_IDENTIFIER in line), None)
+    if line is None:
+        return None
+    location = line.split(LOCATION_IDENTIFIER)[1].split("|")[0].strip()
+    if "-" in location:
+        start, end = map(int, location.split("-"))
+    else:
+        start = end = int(location)
+    return start, end
+
+
+def regex_location(entry: str) -> Optional[Tuple[int, int]]:
+    """The current parser: the precompiled location pattern of the locale on the metadata line."""
+    metadata = entry.split("\n", 2)[1]
+    location = ENGLISH.location_pattern.search(metadata)
+    if location is None:
+        return None
+    return KindleClippingsProcessor._parse_range(*location.groups())
+
+
+def make_entries(count: int, seed: int):
+    rng = random.Random(seed)
+    entries = []
+    for _ in range(count):
+        start = rng.randrange(1, 20000)
+        location = f"{start}-{start + rng.randrange(1, 30)}" if rng.random() < 0.9 else str(start)
+        page = f"page {start // 15 + 1} | " if rng.random() < 0.5 else ""
+        body = " ".join(["lorem ipsum dolor sit amet"] * rng.randrange(1, 10))
+        entries.append(
+            f"Book (Author)\n- Your Highlight on {page}Location {location}"
+            f" | Added on Sunday, February 5, 2017 9:21:58 PM\n\n{body}\n"
+        )
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the per-clipping cost of the split-based and regex location parsers."
+    )
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    entries = make_entries(args.entries, args.seed)
+    assert list(map(split_location, entries)) == list(map(regex_location, entries))
+
+    print(f"{args.entries} clippings, best of {args.repeat}")
+    print(f"{'parser':<16}{'seconds':>10}{'ns/clipping':>14}")
+    for name, func in [("split", split_location), ("regex", regex_location)]:
+        seconds = min(timeit.repeat(lambda: list(map(func, entries)), number=1, repeat=args.repeat))
+        print(f"{name:<16}{seconds:>10.3f}{seconds / args.entries * 1e9:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class StageResult:
+    """Timing and memory of a single benchmarked stage."""
+
+    def __init__(self, name: str, items: int, seconds: float, peak_bytes: Optional[int]):
+        self.name = name
+        self.items = items
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.seconds if self.seconds else float("inf")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.name,
+            "items": self.items,
+            "seconds": self.seconds,
+            "items_per_second": self.throughput,
+            "peak_memory_bytes": self.peak_bytes,
+        }
+
+
+def run_stage(
+    name: str, func: Callable[[], Any], items: int, measure_memory: bool = True
+) -> Tuple[Any, StageResult]:
+    """
+    Times a stage, then runs it a second time under tracemalloc to record its peak memory, since
+    tracing slows the code down too much to time it at the same time.
+    """
+    started = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - started
+
+    peak_bytes = None
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return result, StageResult(name, items, seconds, peak_bytes)
+
+
+def report(title: str, results: List[StageResult], json_path: Optional[Path] = None) -> None:
+    """Prints the results as a table and optionally writes them as JSON."""
+    print(title)
+    print(f"{'stage':<28}{'items':>10}{'seconds':>10}{'items/s':>14}{'peak MiB':>10}")
+    for result in results:
+        peak = f"{result.peak_bytes / 2**20:.1f}" if result.peak_bytes is not None else "-"
+        print(
+            f"{result.name:<28}{result.items:>10}{result.seconds:>10.3f}"
+            f"{result.throughput:>14,.0f}{peak:>10}"
+        )
+
+    if json_path:
+        json_path.write_text(
+            json.dumps({"title": title, "stages": [r.as_dict() for r in results]}, indent=2),
+            encoding="utf-8",
+        )
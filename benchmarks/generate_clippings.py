@@ -0,0 +1,104 @@
+import argparse
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+WORDS = (
+    "the of and a to in is you that it he was for on are as with his they I at be this have from"
+    " or one had by word but not what all were we when your can said there use an each which she"
+    " do how their if will up other about out many then them these so some her would make like"
+    " him into time has look two more write go see number no way could people my than first"
+    " water been call who oil its now find long down day did get come made may part"
+).split()
+
+
+def format_added_on(moment: datetime) -> str:
+    """Formats a timestamp the way an English Kindle writes it."""
+    hour = moment.hour % 12 or 12
+    return (
+        f"{moment:%A}, {moment:%B} {moment.day}, {moment.year}"
+        f" {hour}:{moment:%M:%S} {'AM' if moment.hour < 12 else 'PM'}"
+    )
+
+
+def generate_clippings(
+    path: Path,
+    books: int = 20,
+    highlights_per_book: int = 500,
+    overlap_rate: float = 0.2,
+    note_rate: float = 0.1,
+    bookmark_rate: float = 0.05,
+    seed: int = 0,
+    newline: str = "\r\n",
+) -> int:
+    """
+    Writes a deterministic 'My Clippings.txt' and returns the number of entries. Books are read
+    in an interleaved order, `overlap_rate` of the highlights re-highlight an earlier passage of
+    the same book, and notes and bookmarks are mixed in at the given rates per highlight.
+    """
+    rng = random.Random(seed)
+    moment = datetime(2020, 1, 1, 8, 0, 0)
+    titles = [f"Synthetic Book {number} (Author {number % 7})" for number in range(books)]
+    cursors = [rng.randint(1, 100) for _ in range(books)]
+    ranges = [[] for _ in range(books)]
+    remaining = [highlights_per_book] * books
+    entries = 0
+
+    with open(path, "w", encoding="utf-8", newline=newline) as file:
+        file.write("\ufeff")
+        while any(remaining):
+            book = rng.choice([number for number, left in enumerate(remaining) if left])
+            moment += timedelta(minutes=rng.randint(1, 90), seconds=rng.randint(0, 59))
+
+            if ranges[book] and rng.random() < overlap_rate:
+                start, end = rng.choice(ranges[book])
+                start, end = max(1, start - rng.randint(0, 3)), end + rng.randint(0, 5)
+            else:
+                start = cursors[book] + rng.randint(1, 20)
+                end = start + rng.randint(0, 12)
+                cursors[book] = end
+            ranges[book].append((start, end))
+            remaining[book] -= 1
+
+            kinds = [("Highlight", f"{start}-{end}", rng.randint(8, 40))]
+            if rng.random() < note_rate:
+                kinds.append(("Note", str(end), rng.randint(2, 15)))
+            if rng.random() < bookmark_rate:
+                kinds.append(("Bookmark", str(start), 0))
+
+            for kind, location, word_count in kinds:
+                text = " ".join(rng.choice(WORDS) for _ in range(word_count))
+                file.write(
+                    f"{titles[book]}\n- Your {kind} on page {start // 15 + 1} | Location {location}"
+                    f" | Added on {format_added_on(moment)}\n\n{text}\n==========\n"
+                )
+                entries += 1
+
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic 'My Clippings.txt'.")
+    parser.add_argument("output_file", type=Path)
+    parser.add_argument("--books", type=int, default=20)
+    parser.add_argument("--highlights_per_book", type=int, default=500)
+    parser.add_argument("--overlap_rate", type=float, default=0.2)
+    parser.add_argument("--note_rate", type=float, default=0.1)
+    parser.add_argument("--bookmark_rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    entries = generate_clippings(
+        args.output_file,
+        args.books,
+        args.highlights_per_book,
+        args.overlap_rate,
+        args.note_rate,
+        args.bookmark_rate,
+        args.seed,
+    )
+    print(f"Wrote {entries} clippings to: {args.output_file}")
+
+
+if __name__ == "__main__":
+    main()
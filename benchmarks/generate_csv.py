@@ -0,0 +1,98 @@
+import argparse
+import csv
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.generate_clippings import WORDS
+
+CATEGORY_CODES = ["Б", "Ж", "В", "К", "М", "А", "P", "F", "C", "N", "FIB", "MIC", "W", "Custom"]
+
+
+def format_date(moment: datetime) -> str:
+    """Formats a timestamp the way mykindletools exports it."""
+    return f"{moment:%a %b %d %Y %H:%M:%S} GMT+0100 (Central European Standard Time)"
+
+
+def random_categories(rng: random.Random) -> str:
+    """Builds category markers such as '(P>F, N)' for a note."""
+    groups = []
+    for _ in range(rng.randint(1, 2)):
+        codes = [
+            ">".join(rng.choice(CATEGORY_CODES) for _ in range(rng.randint(1, 3)))
+            for _ in range(rng.randint(1, 3))
+        ]
+        groups.append(f"({', '.join(codes)})")
+    return " ".join(groups)
+
+
+def generate_csv(
+    path: Path,
+    rows: int = 10000,
+    books: int = 20,
+    overlap_rate: float = 0.2,
+    note_rate: float = 0.5,
+    seed: int = 0,
+) -> int:
+    """
+    Writes a deterministic mykindletools-style CSV export and returns the number of rows.
+    `overlap_rate` of the rows re-highlight an earlier location of the same book, and
+    `note_rate` of them carry a note with category markers.
+    """
+    rng = random.Random(seed)
+    moment = datetime(2020, 1, 1, 8, 0, 0)
+    cursors = [rng.randint(1, 100) for _ in range(books)]
+    ranges = [[] for _ in range(books)]
+
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["book", "author", "location", "date", "highlight_text", "note_text"])
+        for _ in range(rows):
+            book = rng.randrange(books)
+            moment += timedelta(minutes=rng.randint(1, 90), seconds=rng.randint(0, 59))
+
+            if ranges[book] and rng.random() < overlap_rate:
+                start, end = rng.choice(ranges[book])
+                start, end = max(1, start - rng.randint(0, 3)), end + rng.randint(0, 5)
+            else:
+                start = cursors[book] + rng.randint(1, 20)
+                end = start + rng.randint(0, 12)
+                cursors[book] = end
+            ranges[book].append((start, end))
+
+            note = ""
+            if rng.random() < note_rate:
+                words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 15)))
+                note = f"{random_categories(rng)} {words}"
+            writer.writerow(
+                [
+                    f"Synthetic Book {book}",
+                    f"Author {book % 7}",
+                    f"{start}-{end}" if end != start else str(start),
+                    format_date(moment),
+                    " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40))),
+                    note,
+                ]
+            )
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic mykindletools CSV export.")
+    parser.add_argument("output_file", type=Path)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--books", type=int, default=20)
+    parser.add_argument("--overlap_rate", type=float, default=0.2)
+    parser.add_argument("--note_rate", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = generate_csv(
+        args.output_file, args.rows, args.books, args.overlap_rate, args.note_rate, args.seed
+    )
+    print(f"Wrote {rows} rows to: {args.output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, Optional
+
+DELIMITER = b"=========="
+CHUNK_SIZE = 1024 * 1024
+
+
+class AppendedData(NamedTuple):
+    """The data of a clippings file after the part that was processed by an earlier pass."""
+
+    offset: int
+    complete: bytes
+    incomplete: bytes
+    prefix_hash: str
+
+
+def read_appended_data(
+    file_path: Path, offset: int = 0, prefix_hash: Optional[str] = None
+) -> AppendedData:
+    """
+    Read the file after its first `offset` bytes if they still hash to `prefix_hash`, or else
+    the whole file with an offset of 0. The data is split after its last complete delimiter line,
+    as the entries after it may still be written, and the returned hash covers the file up to
+    that point, i.e. the prefix to check on the next pass.
+    """
+
+    with open(file_path, "rb") as file:
+        digest = hashlib.sha256()
+        if offset and (
+            os.fstat(file.fileno()).st_size < offset
+            or _hash_prefix(file, offset, digest) != prefix_hash
+        ):
+            offset = 0
+            file.seek(0)
+            digest = hashlib.sha256()
+        data = file.read()
+
+    length = complete_length(data)
+    digest.update(data[:length])
+    return AppendedData(offset, data[:length], data[length:], digest.hexdigest())
+
+
+def complete_length(data: bytes) -> int:
+    """Length of the data up to and including the last complete delimiter line."""
+
+    length = 0
+    for delimiter in (DELIMITER + b"\n", DELIMITER + b"\r\n"):
+        position = data.rfind(delimiter)
+        if position != -1:
+            length = max(length, position + len(delimiter))
+    return length
+
+
+def _hash_prefix(file: BinaryIO, length: int, digest) -> str:
+    """Feed the first `length` bytes of the file into the digest and return its hex value."""
+
+    remaining = length
+    while remaining > 0:
+        chunk = file.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        digest.update(chunk)
+        remaining -= len(chunk)
+    return digest.hexdigest()
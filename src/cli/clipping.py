@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import NamedTuple, Optional, Tuple
+
+
+class Clipping(NamedTuple):
+    """A single entry of 'My Clippings.txt', parsed once when it is read."""
+
+    title: str
+    author: str
+    kind: str
+    location_start: Optional[int]
+    location_end: Optional[int]
+    page: Optional[str]
+    added_on: Optional[datetime]
+    body: str
+    raw: str
+
+    HIGHLIGHT = "highlight"
+    NOTE = "note"
+    BOOKMARK = "bookmark"
+    UNKNOWN = "unknown"
+
+    @property
+    def book_title(self) -> str:
+        """The book line as written by the Kindle, e.g. 'Title (Author)'."""
+
+        return f"{self.title} ({self.author})" if self.author else self.title
+
+    @property
+    def location(self) -> Optional[Tuple[int, int]]:
+        """The location range of the clipping, if the entry has one."""
+
+        if self.location_start is None:
+            return None
+        return self.location_start, self.location_end
+
+    @staticmethod
+    def split_book_title(book_title: str) -> Tuple[str, str]:
+        """Split a book line such as 'Title (Author)' into the title and the author."""
+
+        if book_title.endswith(")") and " (" in book_title:
+            title, _, author = book_title[:-1].rpartition(" (")
+            return title, author
+        return book_title, ""
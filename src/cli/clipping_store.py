@@ -0,0 +1,267 @@
+import json
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from src.cli.appended_data import read_appended_data
+    from src.cli.clipping import Clipping
+except ImportError:  # Run as a script from src/cli
+    from appended_data import read_appended_data
+    from clipping import Clipping
+
+if TYPE_CHECKING:
+    from src.cli.main import KindleClippingsProcessor
+
+
+class ClippingStore(Sequence):
+    """
+    SQLite database of the parsed clippings of a 'My Clippings.txt', in file order.
+
+    Like the incremental mode, only the entries appended to the file since it was last loaded
+    are parsed, and the whole file only if its loaded part changed. Books are listed and filtered
+    with indexed queries, and the clipping bodies are indexed for full-text search. Removing
+    duplicates depends on which highlights were kept before, so it streams the rows newest first
+    through the interval index instead of running as a single query.
+    """
+
+    SCHEMA_VERSION = 2
+    COLUMNS = (
+        "position",
+        "title",
+        "author",
+        "kind",
+        "location_start",
+        "location_end",
+        "page",
+        "added_on",
+        "body",
+        "raw",
+    )
+
+    def __init__(self, database_path: Path):
+        self.database_path = database_path
+        self._connection = sqlite3.connect(database_path)
+        if self._get_metadata("schema_version") != str(self.SCHEMA_VERSION):
+            self._create_schema()
+        self.full_text = (
+            self._connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'clippings_fts'"
+            ).fetchone()
+            is not None
+        )
+
+    def __enter__(self) -> "ClippingStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+
+        self._connection.close()
+
+    def load(self, processor: "KindleClippingsProcessor") -> bool:
+        """
+        Bring the database up to date with the file of the processor. Returns whether anything
+        was parsed, i.e. False if the file is unchanged since it was last loaded.
+        """
+
+        stat = os.stat(processor.file_path)
+        signature = json.dumps([str(processor.file_path), stat.st_size, stat.st_mtime_ns])
+        if self._get_metadata("signature") == signature:
+            return False
+
+        if processor.locale is None and self._get_metadata("locale"):
+            processor.locale = next(
+                (
+                    locale
+                    for locale in processor.LOCALES
+                    if locale.name == self._get_metadata("locale")
+                ),
+                None,
+            )
+
+        offset = int(self._get_metadata("offset") or 0)
+        complete_rows = int(self._get_metadata("complete_rows") or 0)
+        appended = read_appended_data(
+            processor.file_path, offset, self._get_metadata("prefix_hash")
+        )
+        if appended.offset != offset:
+            complete_rows = 0
+
+        # Entries after the last delimiter may still be incomplete, so they are parsed again
+        # on the next load
+        complete_clippings = processor.parse_data(appended.complete)
+        clippings = complete_clippings + processor.parse_data(appended.incomplete)
+
+        placeholders = ", ".join("?" for _ in self.COLUMNS)
+        with self._connection:
+            self._connection.execute("DELETE FROM clippings WHERE position >= ?", (complete_rows,))
+            self._connection.executemany(
+                f"INSERT INTO clippings VALUES ({placeholders})",
+                (
+                    (
+                        position,
+                        *clipping[:6],
+                        self._format_added_on(clipping.added_on),
+                        *clipping[7:],
+                    )
+                    for position, clipping in enumerate(clippings, complete_rows)
+                ),
+            )
+            self._set_metadata("offset", str(appended.offset + len(appended.complete)))
+            self._set_metadata("prefix_hash", appended.prefix_hash)
+            self._set_metadata("complete_rows", str(complete_rows + len(complete_clippings)))
+            self._set_metadata("locale", processor.locale.name if processor.locale else "")
+            self._set_metadata("signature", signature)
+        return True
+
+    def search(self, phrase: str, limit: int = 10) -> List[Tuple[Clipping, float]]:
+        """
+        Find the clippings whose body contains the phrase, best first by their BM25 rank (lower
+        is better). Without FTS5 in SQLite, bodies are scanned in file order instead.
+        """
+
+        if not phrase.strip():
+            return []
+
+        columns = ", ".join(f"clippings.{column}" for column in self.COLUMNS[1:])
+        if self.full_text:
+            rows = self._connection.execute(
+                f"SELECT {columns}, bm25(clippings_fts) AS rank FROM clippings_fts"
+                " JOIN clippings ON clippings.position = clippings_fts.rowid"
+                " WHERE clippings_fts MATCH ? ORDER BY rank LIMIT ?",
+                ('"' + phrase.replace('"', '""') + '"', limit),
+            )
+        else:
+            pattern = phrase.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            rows = self._connection.execute(
+                f"SELECT {columns}, 0.0 FROM clippings WHERE body LIKE ? ESCAPE '\\'"
+                " ORDER BY position LIMIT ?",
+                (f"%{pattern}%", limit),
+            )
+        return [(self._to_clipping(row[:-1]), row[-1]) for row in rows]
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM clippings").fetchone()[0]
+
+    def __getitem__(self, position: int) -> Clipping:
+        if position < 0:
+            position += len(self)
+        rows = self._select("WHERE position = ?", (position,))
+        if not rows:
+            raise IndexError(position)
+        return rows[0]
+
+    def __iter__(self) -> Iterator[Clipping]:
+        return iter(self._select("ORDER BY position"))
+
+    def __reversed__(self) -> Iterator[Clipping]:
+        return iter(self._select("ORDER BY position DESC"))
+
+    def books(self) -> List[str]:
+        """Sorted titles of the books that have at least one highlight."""
+
+        rows = self._connection.execute(
+            "SELECT DISTINCT title, author FROM clippings WHERE kind = ?",
+            (Clipping.HIGHLIGHT,),
+        )
+        return sorted(f"{title} ({author})" if author else title for title, author in rows)
+
+    def book_clippings(self, book_title: str) -> List[Clipping]:
+        """All clippings of the book, in file order."""
+
+        return self._select(
+            "WHERE title = ? AND author = ? ORDER BY position",
+            Clipping.split_book_title(book_title),
+        )
+
+    def _select(self, clause: str, parameters: Sequence = ()) -> List[Clipping]:
+        """Select clippings with the WHERE and ORDER BY clauses."""
+
+        rows = self._connection.execute(
+            f"SELECT {', '.join(self.COLUMNS[1:])} FROM clippings {clause}", parameters
+        )
+        return [self._to_clipping(row) for row in rows]
+
+    @staticmethod
+    def _to_clipping(row: Sequence) -> Clipping:
+        """Convert a row of the clipping columns back into a clipping."""
+
+        return Clipping(*row[:6], datetime.fromisoformat(row[6]) if row[6] else None, *row[7:])
+
+    @staticmethod
+    def _format_added_on(added_on: Optional[datetime]) -> Optional[str]:
+        """Store timestamps as ISO 8601 text, which sorts chronologically."""
+
+        return added_on.isoformat() if added_on else None
+
+    def _create_schema(self) -> None:
+        """Create the tables and indexes, dropping those of an older schema version."""
+
+        with self._connection:
+            self._connection.executescript("""
+                DROP TABLE IF EXISTS clippings_fts;
+                DROP TABLE IF EXISTS clippings;
+                DROP TABLE IF EXISTS metadata;
+                CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE clippings (
+                    position INTEGER PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    author TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    location_start INTEGER,
+                    location_end INTEGER,
+                    page TEXT,
+                    added_on TEXT,
+                    body TEXT NOT NULL,
+                    raw TEXT NOT NULL
+                );
+                CREATE INDEX clippings_book ON clippings (title, author, location_start);
+                CREATE INDEX clippings_added_on ON clippings (added_on);
+                """)
+            try:
+                self._connection.executescript("""
+                    CREATE VIRTUAL TABLE clippings_fts
+                        USING fts5(body, content='clippings', content_rowid='position');
+                    CREATE TRIGGER clippings_insert AFTER INSERT ON clippings BEGIN
+                        INSERT INTO clippings_fts (rowid, body) VALUES (new.position, new.body);
+                    END;
+                    CREATE TRIGGER clippings_delete AFTER DELETE ON clippings BEGIN
+                        INSERT INTO clippings_fts (clippings_fts, rowid, body)
+                            VALUES ('delete', old.position, old.body);
+                    END;
+                    """)
+            except sqlite3.OperationalError:  # SQLite built without FTS5
+                pass
+            self._set_metadata("schema_version", str(self.SCHEMA_VERSION))
+
+    def _get_metadata(self, key: str) -> Optional[str]:
+        """Read a value of the metadata table, or None if it is not set."""
+
+        try:
+            row = self._connection.execute(
+                "SELECT value FROM metadata WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.OperationalError:  # No metadata table yet
+            return None
+        return row[0] if row else None
+
+    def _set_metadata(self, key: str, value: str) -> None:
+        """Set a value of the metadata table."""
+
+        self._connection.execute(
+            "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", (key, value)
+        )
+
+
+def store_path(input_path: Path, store_file: Optional[str] = None) -> Path:
+    """Path of the clippings database, next to the input file unless one is given."""
+
+    if store_file:
+        return Path(store_file).resolve()
+    return input_path.with_name(f"{input_path.name}.sqlite3")
@@ -0,0 +1,246 @@
+import re
+from datetime import datetime
+from typing import Optional, Sequence, Union
+
+
+class Locale:
+    """
+    Words a Kindle writes on the metadata line of an entry in one language.
+
+    Each field of the line gets its own precompiled pattern, so parsing the kind and location of
+    an entry stays a single short scan, and the page and timestamp are only matched when a full
+    clipping is parsed. The timestamp may be given as several patterns tried in order.
+    """
+
+    TIME = r"(?P<hour>\d{1,2}):(?P<minute>\d{2}):(?P<second>\d{2})"
+    MERIDIEM_HOURS = {"am": 0, "pm": 12, "午前": 0, "午後": 12}
+
+    def __init__(
+        self,
+        name: str,
+        highlight: str,
+        note: str,
+        bookmark: str,
+        location: str,
+        page: str,
+        added_on: str,
+        date: Union[str, Sequence[str]],
+        months: Sequence[str] = (),
+    ):
+        self.name = name
+        self.kind_pattern = re.compile(
+            f"(?P<highlight>{re.escape(highlight)})"
+            f"|(?P<note>{re.escape(note)})"
+            f"|(?P<bookmark>{re.escape(bookmark)})",
+            re.IGNORECASE,
+        )
+        self.location_pattern = re.compile(
+            re.escape(location) + r"\s*(\d+)(?:-(\d+))?", re.IGNORECASE
+        )
+        self.page_pattern = re.compile(page, re.IGNORECASE)
+        self.added_on_pattern = re.compile(re.escape(added_on) + r"\s*(.+)", re.IGNORECASE)
+        self.date_patterns = [
+            re.compile(pattern, re.IGNORECASE)
+            for pattern in ([date] if isinstance(date, str) else date)
+        ]
+        self.months = {month: number for number, month in enumerate(months, 1)}
+
+    def __repr__(self) -> str:
+        return f"Locale({self.name!r})"
+
+    def parse_date(self, added_on: str) -> Optional[datetime]:
+        """Parse the 'Added on' timestamp, returning None if it is not recognised."""
+
+        for date_pattern in self.date_patterns:
+            match = date_pattern.search(added_on)
+            if match:
+                break
+        else:
+            return None
+
+        month = match["month"]
+        month = int(month) if month.isdigit() else self.months.get(month.lower())
+        hour = int(match["hour"])
+        meridiem = match.groupdict().get("meridiem")
+        if meridiem:
+            hour = hour % 12 + self.MERIDIEM_HOURS[meridiem.lower()]
+
+        try:
+            return datetime(
+                int(match["year"]),
+                month,
+                int(match["day"]),
+                hour,
+                int(match["minute"]),
+                int(match["second"]),
+            )
+        except (TypeError, ValueError):
+            return None
+
+
+# The languages a Kindle may write entries in; the first is the fallback of the detection
+LOCALES = (
+    Locale(
+        "en",
+        "Your Highlight",
+        "Your Note",
+        "Your Bookmark",
+        "Location",
+        r"\bpage\s+(?P<page>[^\s|]+)",
+        "Added on",
+        [
+            r"(?P<month>[^\W\d_]+) (?P<day>\d{1,2}), (?P<year>\d{4}) "
+            + Locale.TIME
+            + r"(?: (?P<meridiem>[AP]M))?",
+            # Day first, as written by Kindles set to British English
+            r"(?P<day>\d{1,2}) (?P<month>[^\W\d_]+) (?P<year>\d{4}) "
+            + Locale.TIME
+            + r"(?: (?P<meridiem>[AP]M))?",
+        ],
+        [
+            "january",
+            "february",
+            "march",
+            "april",
+            "may",
+            "june",
+            "july",
+            "august",
+            "september",
+            "october",
+            "november",
+            "december",
+        ],
+    ),
+    Locale(
+        "de",
+        "Ihre Markierung",
+        "Ihre Notiz",
+        "Ihr Lesezeichen",
+        "Position",
+        r"\bSeite\s+(?P<page>[^\s|]+)",
+        "Hinzugefügt am",
+        r"(?P<day>\d{1,2})\. (?P<month>[^\W\d_]+) (?P<year>\d{4}) " + Locale.TIME,
+        [
+            "januar",
+            "februar",
+            "märz",
+            "april",
+            "mai",
+            "juni",
+            "juli",
+            "august",
+            "september",
+            "oktober",
+            "november",
+            "dezember",
+        ],
+    ),
+    Locale(
+        "es",
+        "Tu subrayado",
+        "Tu nota",
+        "Tu marcador",
+        "posición",
+        r"\bpágina\s+(?P<page>[^\s|]+)",
+        "Añadido el",
+        r"(?P<day>\d{1,2}) de (?P<month>[^\W\d_]+) de (?P<year>\d{4}) " + Locale.TIME,
+        [
+            "enero",
+            "febrero",
+            "marzo",
+            "abril",
+            "mayo",
+            "junio",
+            "julio",
+            "agosto",
+            "septiembre",
+            "octubre",
+            "noviembre",
+            "diciembre",
+        ],
+    ),
+    Locale(
+        "fr",
+        "Votre surlignement",
+        "Votre note",
+        "Votre signet",
+        "emplacement",
+        r"\bpage\s+(?P<page>[^\s|]+)",
+        "Ajouté le",
+        r"(?P<day>\d{1,2}) (?P<month>[^\W\d_]+) (?P<year>\d{4}) " + Locale.TIME,
+        [
+            "janvier",
+            "février",
+            "mars",
+            "avril",
+            "mai",
+            "juin",
+            "juillet",
+            "août",
+            "septembre",
+            "octobre",
+            "novembre",
+            "décembre",
+        ],
+    ),
+    Locale(
+        "it",
+        "La tua evidenziazione",
+        "La tua nota",
+        "Il tuo segnalibro",
+        "posizione",
+        r"\bpagina\s+(?P<page>[^\s|]+)",
+        "Aggiunto in data",
+        r"(?P<day>\d{1,2}) (?P<month>[^\W\d_]+) (?P<year>\d{4}) " + Locale.TIME,
+        [
+            "gennaio",
+            "febbraio",
+            "marzo",
+            "aprile",
+            "maggio",
+            "giugno",
+            "luglio",
+            "agosto",
+            "settembre",
+            "ottobre",
+            "novembre",
+            "dicembre",
+        ],
+    ),
+    Locale(
+        "pt",
+        "Seu destaque",
+        "Sua nota",
+        "Seu marcador",
+        "posição",
+        r"\bpágina\s+(?P<page>[^\s|]+)",
+        "Adicionado:",
+        r"(?P<day>\d{1,2}) de (?P<month>[^\W\d_]+) de (?P<year>\d{4}) " + Locale.TIME,
+        [
+            "janeiro",
+            "fevereiro",
+            "março",
+            "abril",
+            "maio",
+            "junho",
+            "julho",
+            "agosto",
+            "setembro",
+            "outubro",
+            "novembro",
+            "dezembro",
+        ],
+    ),
+    Locale(
+        "ja",
+        "ハイライト",
+        "メモ",
+        "ブックマーク",
+        "位置No.",
+        r"(?P<page>[^\s|]+?)\s*ページ",
+        "作成日:",
+        r"(?P<year>\d{4})年(?P<month>\d{1,2})月(?P<day>\d{1,2})日.*?(?P<meridiem>午前|午後)?\s*"
+        + Locale.TIME,
+    ),
+)
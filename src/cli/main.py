@@ -1,41 +1,309 @@
 import argparse
+import bisect
+import glob
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import re
+import time
 import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, nullcontext
+from datetime import datetime
+from itertools import chain, islice, repeat
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    from src.cli.appended_data import read_appended_data
+    from src.cli.clipping import Clipping
+    from src.cli.clipping_store import ClippingStore, store_path
+    from src.cli.locales import LOCALES, Locale
+    from src.cli.mapped_clippings import MappedClippings, TitleIndex
+    from src.cli.minhash import MinHashIndex
+    from src.cli.stage_timer import StageTimer, profiled
+except ImportError:  # Run as a script from src/cli
+    from appended_data import read_appended_data
+    from clipping import Clipping
+    from clipping_store import ClippingStore, store_path
+    from locales import LOCALES, Locale
+    from mapped_clippings import MappedClippings, TitleIndex
+    from minhash import MinHashIndex
+    from stage_timer import StageTimer, profiled
+
+
+def ranges_overlap(first_range: Tuple[int, int], second_range: Tuple[int, int]) -> bool:
+    """Check whether two ranges overlap (see `KindleClippingsProcessor.is_overlap`)."""
+
+    first_start, first_end = first_range
+    second_start, second_end = second_range
+
+    if first_start == second_start and first_end == second_end:  # Check for exact overlap
+        return True
+
+    return (first_start < second_start < first_end or first_start < second_end < first_end) or (
+        second_start < first_start < second_end or second_start < first_end < second_end
+    )
+
+
+class HighlightIntervalIndex:
+    """
+    Sorted index of mutually non-overlapping highlight ranges of a single book.
+
+    Ranges are only added when they do not overlap any stored range, so the stored ranges
+    are ordered by both start and end. Every range that may overlap a query is therefore
+    found in one contiguous slice located with two binary searches, and only a bounded
+    number of ranges touching the query endpoints has to be checked one by one.
+    """
+
+    def __init__(self, ranges: Iterable[Tuple[int, int]] = ()):
+        self._ranges: List[Tuple[int, int]] = sorted((start, end) for start, end in ranges)
+        self._ends: List[int] = [end for _, end in self._ranges]
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return iter(self._ranges)
+
+    def overlaps(self, highlight_range: Tuple[int, int]) -> bool:
+        """Check whether the range overlaps any range stored in the index."""
+
+        start, end = highlight_range
+        low = bisect.bisect_left(self._ends, start)
+        high = bisect.bisect_right(self._ranges, (end, float("inf")))
+        return any(ranges_overlap(highlight_range, self._ranges[i]) for i in range(low, high))
+
+    def add(self, highlight_range: Tuple[int, int]) -> None:
+        """Insert a range that does not overlap any stored range."""
+
+        position = bisect.bisect_left(self._ranges, highlight_range)
+        self._ranges.insert(position, highlight_range)
+        self._ends.insert(position, highlight_range[1])
 
 
 class KindleClippingsProcessor:
+    FILE_NAME = "My Clippings.txt"
     HIGHLIGHT_IDENTIFIER = "Your Highlight"
+    NOTE_IDENTIFIER = "Your Note"
+    BOOKMARK_IDENTIFIER = "Your Bookmark"
     LOCATION_IDENTIFIER = "Location"
+    PAGE_IDENTIFIER = "page"
+    ADDED_ON_IDENTIFIER = "Added on"
     DELIMITER = "==========\n"
+    CHUNK_SIZE = 1024 * 1024
+    PARALLEL_MIN_SIZE = 8 * 1024 * 1024
+    WRITE_BUFFER_SIZE = 1024 * 1024
+    WRITE_BATCH_SIZE = 1024
+    STATE_VERSION = 2
+    NEAR_DUPLICATE_MIN_WORDS = 6
+
+    HIGHLIGHT = Clipping.HIGHLIGHT
+    NOTE = Clipping.NOTE
+    BOOKMARK = Clipping.BOOKMARK
+    UNKNOWN = Clipping.UNKNOWN
+
+    # Detected once per file from its first entries; the first locale is the fallback
+    LOCALE_SAMPLE_SIZE = 10
+    LOCALES = LOCALES
 
     def __init__(self, file_path: Path):
         """Initialize the processor with a file path."""
 
         self.file_path = file_path
-        self.book_highlights: Dict[str, Set[Tuple[int, int]]] = {}
+        self.book_highlights: Dict[str, HighlightIntervalIndex] = {}
+        self.locale: Optional[Locale] = None
+
+    def map_clippings(self) -> "MappedClippings":
+        """Memory-map the file, decoding clippings only when they are accessed."""
+
+        return MappedClippings(self)
 
-    def read_clippings(self) -> List[str]:
+    def read_clippings(self) -> List[Clipping]:
         """Read and parse clippings from the file."""
 
+        return list(self.iter_clippings())
+
+    def read_clippings_parallel(self, workers: Optional[int] = None) -> List[Clipping]:
+        """
+        Read and parse clippings in worker processes, each parsing a byte range of the file that
+        starts and ends on an entry boundary. Clippings are returned in file order, as by
+        `read_clippings`; files smaller than PARALLEL_MIN_SIZE are read in this process.
+        """
+
+        workers = workers or os.cpu_count() or 1
+        if self.locale is None:
+            self.locale = self.detect_locale(
+                list(islice(self.iter_entries(), self.LOCALE_SAMPLE_SIZE))
+            )
+
+        byte_ranges = self._split_byte_ranges(workers)
+        if len(byte_ranges) <= 1:
+            return self.read_clippings()
+
+        starts, ends = zip(*byte_ranges)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = executor.map(
+                parse_clippings_range,
+                repeat(self.file_path),
+                starts,
+                ends,
+                repeat(self.locale),
+            )
+            return list(chain.from_iterable(parts))
+
+    def _split_byte_ranges(self, parts: int) -> List[Tuple[int, int]]:
+        """Split the file into at most `parts` byte ranges, each ending after a delimiter line."""
+
+        size = os.path.getsize(self.file_path)
+        if parts <= 1 or size == 0 or size < self.PARALLEL_MIN_SIZE:
+            return [(0, size)]
+
+        boundaries = [0]
+        with open(self.file_path, "rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data:
+            delimiter = self.DELIMITER.strip().encode()
+            for part in range(1, parts):
+                position = data.find(delimiter, max(size * part // parts, boundaries[-1]))
+                while position != -1:
+                    line_end = position + len(delimiter)
+                    if data[line_end : line_end + 1] == b"\n":
+                        break
+                    if data[line_end : line_end + 2] == b"\r\n":
+                        line_end += 1
+                        break
+                    position = data.find(delimiter, position + 1)
+                if position == -1 or line_end + 1 >= size:
+                    break
+                boundaries.append(line_end + 1)
+
+        boundaries.append(size)
+        return list(zip(boundaries, boundaries[1:]))
+
+    def iter_clippings(self) -> Iterator[Clipping]:
+        """Lazily read and parse clippings from the file."""
+
+        entries = self.iter_entries()
+        if self.locale is None:
+            sample = list(islice(entries, self.LOCALE_SAMPLE_SIZE))
+            self.locale = self.detect_locale(sample)
+            entries = chain(sample, entries)
+        return map(self.parse_clipping, entries)
+
+    def iter_entries(self) -> Iterator[str]:
+        """Lazily read raw entries from the file in chunks, one entry per delimiter."""
+
         with open(self.file_path, "r", encoding="utf-8") as file:
-            content = file.read().split(self.DELIMITER)
-            return [entry for entry in content if entry.strip()]
+            pending = ""
+            for chunk in iter(lambda: file.read(self.CHUNK_SIZE), ""):
+                *entries, pending = (pending + chunk).split(self.DELIMITER)
+                yield from (entry for entry in entries if entry.strip())
+
+            if pending.strip():
+                yield pending
+
+    def parse_data(self, data: bytes) -> List[Clipping]:
+        """Parse the entries in raw bytes of the file, detecting the locale if it is not known."""
+
+        entries = [
+            entry
+            for entry in data.decode("utf-8").replace("\r\n", "\n").split(self.DELIMITER)
+            if entry.strip()
+        ]
+        if self.locale is None:
+            self.locale = self.detect_locale(entries[: self.LOCALE_SAMPLE_SIZE])
+        return [self.parse_clipping(entry) for entry in entries]
+
+    def detect_locale(self, entries: Iterable[str]) -> Locale:
+        """Pick the locale whose words match the metadata lines of the sample entries best."""
+
+        metadata_lines = [self._split_entry(entry)[1] for entry in entries]
+        scores = [
+            sum(self._parse_kind(metadata, locale) != self.UNKNOWN for metadata in metadata_lines)
+            for locale in self.LOCALES
+        ]
+        return self.LOCALES[scores.index(max(scores))]
+
+    def parse_clipping(self, entry: str, locale: Optional[Locale] = None) -> Clipping:
+        """
+        Parse a raw entry into a clipping record. The locale of the processor is used unless one
+        is given, and is detected from this entry if it is not known yet.
+        """
+
+        locale = locale or self.locale or self._detect_entry_locale(entry)
+        book_line, metadata, body = self._split_entry(entry)
+
+        title, author = Clipping.split_book_title(book_line.strip())
+
+        kind = self._parse_kind(metadata, locale)
+
+        location_start = location_end = None
+        location = locale.location_pattern.search(metadata)
+        if location:
+            location_start, location_end = self._parse_range(*location.groups())
+
+        page = locale.page_pattern.search(metadata)
+        if page:
+            page = page["page"]
+
+        added_on = locale.added_on_pattern.search(metadata)
+        if added_on:
+            added_on = locale.parse_date(added_on.group(1))
+
+        return Clipping(
+            title, author, kind, location_start, location_end, page, added_on, body.strip(), entry
+        )
+
+    def parse_header(self, header: str, locale: Optional[Locale] = None) -> Tuple[str, str]:
+        """Parse the book title and the kind from the first two lines of an entry."""
+
+        locale = locale or self.locale or self._detect_entry_locale(header)
+        book_line, metadata, _ = self._split_entry(header)
+        return book_line.strip(), self._parse_kind(metadata, locale)
+
+    def _detect_entry_locale(self, entry: str) -> Locale:
+        """Detect the locale from a single entry when it was not detected from the file."""
 
-    def extract_book_title_and_range(self, clipping: str) -> Tuple[str, Tuple[int, int]]:
-        """Extract the book title and highlight range from a clipping."""
+        self.locale = self.detect_locale([entry])
+        return self.locale
 
-        lines = clipping.split("\n")
-        book_title = lines[0]
-        location_line = next(line for line in lines if self.LOCATION_IDENTIFIER in line)
-        location = location_line.split(self.LOCATION_IDENTIFIER)[1].split("|")[0].strip()
+    @staticmethod
+    def _split_entry(entry: str) -> Tuple[str, str, str]:
+        """Split an entry into its book line, metadata line and body."""
 
-        if "-" in location:
-            start, end = map(int, location.split("-"))
-        else:
-            start = end = int(location)
+        book_line, _, rest = entry.lstrip("\ufeff\n").partition("\n")
+        metadata, _, body = rest.partition("\n")
+        return book_line, metadata, body
 
-        return book_title, (start, end)
+    def _parse_kind(self, metadata: str, locale: Locale) -> str:
+        """Detect whether the metadata line belongs to a highlight, note or bookmark."""
+
+        match = locale.kind_pattern.search(metadata)
+        return match.lastgroup if match else self.UNKNOWN
+
+    @staticmethod
+    def _parse_range(start: str, end: Optional[str]) -> Tuple[int, int]:
+        """
+        Convert the digits of a location range into numbers. A single location has no end, and a
+        shortened end such as '1234-56' keeps the leading digits of the start, i.e. 1234-1256.
+        """
+
+        if end is None:
+            return int(start), int(start)
+
+        location_start = int(start)
+        if len(end) >= len(start):
+            return location_start, int(end)
+
+        scale = 10 ** len(end)
+        location_end = location_start - location_start % scale + int(end)
+        if location_end < location_start:
+            # The shortened end wrapped around, e.g. '1298-02' is 1298-1302
+            location_end += scale
+        return location_start, location_end
 
     def is_overlap(self, first_range: Tuple[int, int], second_range: Tuple[int, int]) -> bool:
         """
@@ -44,106 +312,505 @@ class KindleClippingsProcessor:
         where the other begins.
         """
 
-        first_start, first_end = first_range
-        second_start, second_end = second_range
+        return ranges_overlap(first_range, second_range)
 
-        if first_start == second_start and first_end == second_end:  # Check for exact overlap
-            return True
-
-        return (first_start < second_start < first_end or first_start < second_end < first_end) or (
-            second_start < first_start < second_end or second_start < first_end < second_end
-        )
-
-    def remove_duplicates(self, clippings: List[str]) -> List[str]:
+    def remove_duplicates(self, clippings: Iterable[Clipping]) -> List[Clipping]:
         """Remove duplicate highlights from the list of clippings."""
 
+        # The latest highlight wins, so entries are walked from the end of the file
+        if not isinstance(clippings, Sequence):
+            clippings = list(clippings)
         unique_clippings = []
 
         for clipping in reversed(clippings):
-            if self.HIGHLIGHT_IDENTIFIER not in clipping:
+            if not self._is_superseded(clipping):
                 unique_clippings.append(clipping)
-                continue
 
-            book_title, highlight_range = self.extract_book_title_and_range(clipping.strip())
-            if book_title not in self.book_highlights:
-                self.book_highlights[book_title] = set()
+        return list(reversed(unique_clippings))
 
-            if any(
-                self.is_overlap(highlight_range, existing_range)
-                for existing_range in self.book_highlights[book_title]
-            ):
+    def remove_near_duplicates(
+        self, clippings: Iterable[Clipping], threshold: float = 0.8
+    ) -> List[Clipping]:
+        """
+        Remove highlights whose text nearly equals that of a later highlight, also in other books,
+        e.g. a passage highlighted again in another edition. Texts shorter than
+        NEAR_DUPLICATE_MIN_WORDS words are never removed, as they match too easily by chance.
+        """
+
+        clippings = list(clippings)
+        positions = [
+            position
+            for position, clipping in enumerate(clippings)
+            if clipping.kind == self.HIGHLIGHT
+            and len(MinHashIndex.WORD_PATTERN.findall(clipping.body))
+            >= self.NEAR_DUPLICATE_MIN_WORDS
+        ]
+        labels = MinHashIndex(threshold).clusters([clippings[p].body for p in positions])
+
+        # The latest highlight of every cluster wins, as in `remove_duplicates`
+        latest_positions = {}
+        for position, label in zip(positions, labels):
+            latest_positions[label] = position
+        duplicates = set(positions).difference(latest_positions.values())
+
+        return [
+            clipping for position, clipping in enumerate(clippings) if position not in duplicates
+        ]
+
+    def merge_positions(self, mapped_files: List["MappedClippings"]) -> List[Tuple[int, int]]:
+        """
+        Merge the clippings of several files by their 'Added on' timestamp and remove duplicates
+        across all of them. Returns the (file, position) pairs of the kept clippings, oldest first.
+
+        Files are walked backwards and merged newest first, so the latest highlight wins as in
+        `remove_duplicates`, and only the positions of kept clippings are held in memory. Notes
+        and bookmarks found in several files are kept once.
+        """
+
+        newest_first = heapq.merge(
+            *(
+                self._iter_newest_first(file_number, mapped)
+                for file_number, mapped in enumerate(mapped_files)
+            ),
+            key=lambda item: item[:3],
+            reverse=True,
+        )
+
+        kept_positions = []
+        seen_entries = set()
+        for _, file_number, position, clipping in newest_first:
+            if clipping.kind == self.HIGHLIGHT and clipping.location_start is not None:
+                if self._is_superseded(clipping):
+                    continue
+            else:
+                entry_hash = hashlib.blake2b(clipping.raw.encode("utf-8"), digest_size=16).digest()
+                if entry_hash in seen_entries:
+                    continue
+                seen_entries.add(entry_hash)
+            kept_positions.append((file_number, position))
+
+        kept_positions.reverse()
+        return kept_positions
+
+    @staticmethod
+    def _iter_newest_first(
+        file_number: int, mapped: "MappedClippings"
+    ) -> Iterator[Tuple[datetime, int, int, Clipping]]:
+        """
+        Yield the clippings of a file from the end, keyed by their timestamp, file number and
+        position. Equal timestamps thus keep the order of the file, and the later of several files
+        counts as the newer one. Clippings without a parsable timestamp take that of the closest
+        earlier clipping, so they stay in place instead of sorting as the oldest of all files.
+        """
+
+        undated_positions = []
+        for position in reversed(range(len(mapped))):
+            clipping = mapped[position]
+            if clipping.added_on is None:
+                undated_positions.append(position)
                 continue
+            for undated_position in undated_positions:
+                yield clipping.added_on, file_number, undated_position, mapped[undated_position]
+            undated_positions.clear()
+            yield clipping.added_on, file_number, position, clipping
 
-            self.book_highlights[book_title].add(highlight_range)
-            unique_clippings.append(clipping)
+        for undated_position in undated_positions:
+            yield datetime.min, file_number, undated_position, mapped[undated_position]
 
-        return list(reversed(unique_clippings))
+    def _is_superseded(self, clipping: Clipping) -> bool:
+        """
+        Check a highlight against the later highlights of its book, recording it if it is kept.
+        Clippings are expected from the newest to the oldest.
+        """
+
+        if clipping.kind != self.HIGHLIGHT or clipping.location_start is None:
+            return False
+
+        book_index = self.book_highlights.setdefault(clipping.book_title, HighlightIntervalIndex())
+        if book_index.overlaps(clipping.location):
+            return True
 
-    def save_cleaned_clippings(self, output_path: Path, formatted_clippings: List[str]) -> None:
-        """Save the formatted clippings to a file."""
+        book_index.add(clipping.location)
+        return False
 
-        with open(output_path, "w", encoding="utf-8") as file:
-            for clipping in formatted_clippings:
-                file.write(clipping)
-                if not clipping.strip().endswith(self.DELIMITER.strip()):
-                    file.write("\n")
+    def save_cleaned_clippings(
+        self,
+        output_path: Path,
+        formatted_clippings: Iterable[str],
+        append: bool = False,
+        buffer_size: Optional[int] = None,
+    ) -> None:
+        """Save the formatted clippings to a file, writing them in batches through a buffer."""
 
-    def filter_clippings_by_book(self, clippings: List[str], book_title: str) -> List[str]:
-        """Filter clippings for a specific book."""
+        formatted_clippings = iter(formatted_clippings)
+        with open(
+            output_path,
+            "a" if append else "w",
+            encoding="utf-8",
+            buffering=buffer_size or self.WRITE_BUFFER_SIZE,
+        ) as file:
+            while True:
+                batch = list(islice(formatted_clippings, self.WRITE_BATCH_SIZE))
+                if not batch:
+                    break
+                file.writelines(batch)
+
+    def write_clippings(
+        self,
+        output_path: Path,
+        clippings: Iterable[Clipping],
+        format_style: str,
+        current_book_title: str = "",
+        append: bool = False,
+        buffer_size: Optional[int] = None,
+    ) -> None:
+        """Format the clippings on the fly and save them in a single pass."""
+
+        self.save_cleaned_clippings(
+            output_path,
+            self.iter_formatted(clippings, format_style, current_book_title),
+            append,
+            buffer_size,
+        )
 
-        filtered_clippings = [clipping for clipping in clippings if book_title in clipping]
+    def build_title_index(self, clippings: Iterable[Clipping]) -> "TitleIndex":
+        """Index the positions of the clippings of every book in a single pass."""
+
+        if isinstance(clippings, MappedClippings):
+            return clippings.title_index
+
+        title_index = TitleIndex()
+        for position, clipping in enumerate(clippings):
+            title_index.add(position, clipping.book_title, clipping.kind == self.HIGHLIGHT)
+        return title_index
+
+    def filter_clippings_by_book(
+        self,
+        clippings: Iterable[Clipping],
+        book_title: str,
+        title_index: Optional["TitleIndex"] = None,
+    ) -> List[Clipping]:
+        """Filter clippings for a specific book, using the title index if one is given."""
+
+        if isinstance(clippings, ClippingStore):
+            return clippings.book_clippings(book_title)
+        if title_index is None and isinstance(clippings, MappedClippings):
+            title_index = clippings.title_index
+        if title_index is not None:
+            return [clippings[position] for position in title_index.positions(book_title)]
+
+        filtered_clippings = [
+            clipping for clipping in clippings if clipping.book_title == book_title
+        ]
         return filtered_clippings
 
-    def list_books(self, clippings: List[str]) -> List[str]:
-        """List all unique book titles from the clippings."""
+    def list_books(
+        self, clippings: Iterable[Clipping], title_index: Optional["TitleIndex"] = None
+    ) -> List[str]:
+        """List all unique book titles from the clippings, using the title index if one is given."""
+
+        if isinstance(clippings, ClippingStore):
+            return clippings.books()
+        if title_index is None and isinstance(clippings, MappedClippings):
+            title_index = clippings.title_index
+        if title_index is not None:
+            return title_index.books()
 
         titles = set()
         for clipping in clippings:
-            if self.HIGHLIGHT_IDENTIFIER in clipping:
-                book_title = clipping.split("\n")[0]
-                titles.add(book_title)
+            if clipping.kind == self.HIGHLIGHT:
+                titles.add(clipping.book_title)
         return sorted(titles)
 
-    def apply_formatting(self, clippings: List[str], format_style: str) -> List[str]:
+    def apply_formatting(
+        self, clippings: Iterable[Clipping], format_style: str, current_book_title: str = ""
+    ) -> List[str]:
         """Apply specified formatting style to the clippings."""
 
+        return list(self.iter_formatted(clippings, format_style, current_book_title))
+
+    def iter_formatted(
+        self, clippings: Iterable[Clipping], format_style: str, current_book_title: str = ""
+    ) -> Iterator[str]:
+        """
+        Lazily format the clippings, every item ending with its own line break or delimiter.
+        `current_book_title` is the book whose bullet list the output continues, if any.
+        """
+
         if format_style == "bullet":
-            return self._format_with_bullets(clippings)
+            return self._format_with_bullets(clippings, current_book_title)
         return self._format_default(clippings)
 
-    def _format_default(self, clippings: List[str]) -> List[str]:
+    def _format_default(self, clippings: Iterable[Clipping]) -> Iterator[str]:
         """Format clippings in the default Kindle format."""
 
-        formatted_clippings = []
         for clipping in clippings:
-            formatted_clipping = f"{clipping}"
-            if not clipping.strip().endswith(self.DELIMITER.strip()):
-                formatted_clipping += self.DELIMITER
-            formatted_clippings.append(formatted_clipping)
-        return formatted_clippings
+            yield clipping.raw + self.DELIMITER
 
-    def _format_with_bullets(self, clippings: List[str]) -> List[str]:
+    def _format_with_bullets(
+        self, clippings: Iterable[Clipping], current_book_title: str = ""
+    ) -> Iterator[str]:
         """Format clippings with bullet points, excluding metadata."""
 
-        formatted_clippings = []
-        current_book_title = ""
-
         for clipping in clippings:
-            if self.HIGHLIGHT_IDENTIFIER in clipping:
-                lines = clipping.split("\n")
-                book_title = lines[0]
-                highlight_text = "".join(lines[3:])
+            if clipping.kind == self.HIGHLIGHT:
+                book_title = clipping.book_title
+                highlight_text = clipping.body.replace("\n", "")
 
                 if book_title != current_book_title:
-                    formatted_clippings.append(f"=========== {book_title} ===========\n")
+                    yield f"=========== {book_title} ===========\n"
                     current_book_title = book_title
 
-                formatted_clippings.append("* " + highlight_text)
+                yield "* " + highlight_text + "\n"
             else:
                 # Ignore non-highlight clippings
                 pass
 
-        return formatted_clippings
+    def process_incremental(
+        self,
+        output_path: Path,
+        format_style: str,
+        state_path: Path,
+        buffer_size: Optional[int] = None,
+    ) -> int:
+        """
+        Deduplicate and append only the entries added to the file since the previous run.
+
+        The state file records the processed byte offset, a hash of the processed prefix, the size
+        and modification time of the output and the per-book highlight index. The whole file is
+        processed again if the prefix changed, the output was changed or removed, the format
+        differs, or a new highlight supersedes one that was already saved.
+        Returns the number of clippings written.
+        """
+
+        state = self._load_state(state_path)
+        if state and (
+            state["format_style"] != format_style
+            or self._output_stamp(output_path) != state["output_stamp"]
+        ):
+            state = None
+
+        appended = read_appended_data(
+            self.file_path, state["offset"] if state else 0, state and state["prefix_hash"]
+        )
+        if state and appended.offset != state["offset"]:
+            state = None
+        clippings = self.parse_data(appended.complete)
+
+        self.book_highlights = {}
+        cleaned_clippings = self.remove_duplicates(clippings)
+
+        if state:
+            saved_highlights = {
+                book_title: HighlightIntervalIndex(ranges)
+                for book_title, ranges in state["book_highlights"].items()
+            }
+            if any(
+                book_title in saved_highlights
+                and saved_highlights[book_title].overlaps(highlight_range)
+                for book_title, book_index in self.book_highlights.items()
+                for highlight_range in book_index
+            ):
+                # Saved highlights cannot be removed from the output, so start over
+                self._remove_state(state_path)
+                return self.process_incremental(output_path, format_style, state_path, buffer_size)
+
+            for book_title, book_index in self.book_highlights.items():
+                saved_index = saved_highlights.setdefault(book_title, HighlightIntervalIndex())
+                for highlight_range in book_index:
+                    saved_index.add(highlight_range)
+            self.book_highlights = saved_highlights
+
+        last_book_title = state["last_book_title"] if state else ""
+        self.write_clippings(
+            output_path,
+            cleaned_clippings,
+            format_style,
+            last_book_title,
+            append=state is not None,
+            buffer_size=buffer_size,
+        )
+
+        highlight_titles = [c.book_title for c in cleaned_clippings if c.kind == self.HIGHLIGHT]
+        self._save_state(
+            state_path,
+            {
+                "version": self.STATE_VERSION,
+                "offset": appended.offset + len(appended.complete),
+                "prefix_hash": appended.prefix_hash,
+                "format_style": format_style,
+                "output_stamp": self._output_stamp(output_path),
+                "last_book_title": highlight_titles[-1] if highlight_titles else last_book_title,
+                "book_highlights": {
+                    book_title: list(book_index)
+                    for book_title, book_index in self.book_highlights.items()
+                },
+            },
+        )
+        return len(cleaned_clippings)
+
+    def _load_state(self, state_path: Path) -> Optional[dict]:
+        """Load the incremental state, ignoring missing or incompatible state files."""
+
+        try:
+            with open(state_path, "r", encoding="utf-8") as file:
+                state = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return state if state.get("version") == self.STATE_VERSION else None
+
+    @staticmethod
+    def _output_stamp(output_path: Path) -> Optional[list]:
+        """Size and modification time of the output, or None if it does not exist."""
+
+        try:
+            stat = output_path.stat()
+        except FileNotFoundError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    @staticmethod
+    def _save_state(state_path: Path, state: dict) -> None:
+        """Write the incremental state next to the output."""
+
+        with open(state_path, "w", encoding="utf-8") as file:
+            json.dump(state, file, ensure_ascii=False)
+
+    @staticmethod
+    def _remove_state(state_path: Path) -> None:
+        """Delete the incremental state so the next pass starts from scratch."""
+
+        state_path.unlink(missing_ok=True)
+
+
+def parse_clippings_range(
+    file_path: Path, start: int, end: int, locale: Optional[Locale] = None
+) -> List[Clipping]:
+    """Parse the entries in a byte range of a clippings file, e.g. in a worker process."""
+
+    processor = KindleClippingsProcessor(file_path)
+    processor.locale = locale
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        return processor.parse_data(file.read(end - start))
+
+
+def clean_clippings_file(
+    input_path: Path,
+    output_path: Path,
+    format_style: str,
+    near_duplicates: Optional[float] = None,
+    buffer_size: Optional[int] = None,
+) -> Tuple[int, int, float]:
+    """
+    Deduplicate and format a whole clippings file without interaction, also removing
+    near-duplicates at the given similarity threshold if one is given. Returns the number of
+    clippings read and kept, and the elapsed seconds.
+    """
+
+    started = time.perf_counter()
+    processor = KindleClippingsProcessor(input_path)
+    with processor.map_clippings() as clippings:
+        total = len(clippings)
+        cleaned_clippings = processor.remove_duplicates(clippings)
+    if near_duplicates is not None:
+        cleaned_clippings = processor.remove_near_duplicates(cleaned_clippings, near_duplicates)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    processor.write_clippings(output_path, cleaned_clippings, format_style, buffer_size=buffer_size)
+    return total, len(cleaned_clippings), time.perf_counter() - started
+
+
+def clean_clippings_files(
+    input_paths: List[Path],
+    output_paths: List[Path],
+    format_style: str,
+    workers: Optional[int] = None,
+    near_duplicates: Optional[float] = None,
+    buffer_size: Optional[int] = None,
+) -> List[Union[Tuple[int, int, float], Exception]]:
+    """
+    Run `clean_clippings_file` for every input in a process pool. The result of a file that
+    failed is the raised exception, so one broken file does not stop the batch.
+    """
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                clean_clippings_file,
+                input_path,
+                output_path,
+                format_style,
+                near_duplicates,
+                buffer_size,
+            )
+            for input_path, output_path in zip(input_paths, output_paths)
+        ]
+
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as error:
+            results.append(error)
+    return results
+
+
+def merge_clippings_files(
+    input_paths: List[Path],
+    output_path: Path,
+    format_style: str,
+    near_duplicates: Optional[float] = None,
+    buffer_size: Optional[int] = None,
+) -> Tuple[int, int]:
+    """
+    Merge several clippings files into one deduplicated output, also removing near-duplicates at
+    the given similarity threshold if one is given. Returns the number of clippings read and
+    kept.
+    """
+
+    processor = KindleClippingsProcessor(None)
+    with ExitStack() as stack:
+        mapped_files = [
+            stack.enter_context(MappedClippings(processor, input_path))
+            for input_path in input_paths
+        ]
+        kept_positions = processor.merge_positions(mapped_files)
+        kept = len(kept_positions)
+        merged_clippings = (
+            mapped_files[file_number][position] for file_number, position in kept_positions
+        )
+        if near_duplicates is not None:
+            merged_clippings = processor.remove_near_duplicates(merged_clippings, near_duplicates)
+            kept = len(merged_clippings)
+        processor.write_clippings(
+            output_path, merged_clippings, format_style, buffer_size=buffer_size
+        )
+
+    return sum(len(mapped) for mapped in mapped_files), kept
+
+
+def find_clippings_files(pattern: str) -> List[Path]:
+    """Find clippings files in a directory (recursively) or by a glob pattern."""
+
+    if Path(pattern).is_dir():
+        input_paths = Path(pattern).rglob(KindleClippingsProcessor.FILE_NAME)
+    else:
+        input_paths = (Path(path) for path in glob.glob(pattern, recursive=True))
+    return sorted(path.resolve() for path in input_paths if path.is_file())
+
+
+def batch_output_paths(input_paths: List[Path], output_dir: Path) -> List[Path]:
+    """Map every input to the same relative location under the output directory."""
+
+    if not input_paths:
+        return []
+
+    root = Path(os.path.commonpath([path.parent for path in input_paths]))
+    output_paths = [output_dir / path.relative_to(root) for path in input_paths]
+    if set(output_paths) & set(input_paths):
+        raise ValueError("The output directory would overwrite the input files.")
+    return output_paths
 
 
 def main():
@@ -151,6 +818,7 @@ def main():
 
     default_input_file = "My Clippings.txt"
     default_output_file = "Cleaned Clippings.txt"
+    default_output_dir = "Cleaned Clippings"
 
     parser = argparse.ArgumentParser(description="Clean up Kindle clippings.")
     parser.add_argument(
@@ -178,47 +846,288 @@ def main():
             " format)."
         ),
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Only process entries added since the previous incremental run and append them to the"
+            " output file (skips the interactive book selection)."
+        ),
+    )
+    parser.add_argument(
+        "--state_file",
+        type=str,
+        default=None,
+        help="Path to the incremental state file (default: '<output_file>.state.json').",
+    )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        default=None,
+        help=(
+            "Directory (searched recursively for 'My Clippings.txt') or glob pattern of clippings"
+            " files to clean without interaction, one output per input."
+        ),
+    )
+    parser.add_argument(
+        "--output_dir",
+        type=str,
+        default=default_output_dir,
+        help=(
+            "Directory for the cleaned files of a batch, mirroring the input layout (default:"
+            f" {default_output_dir})."
+        ),
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help=(
+            "Merge the batch files by their 'Added on' timestamp into a single deduplicated"
+            " output file instead of cleaning each file separately."
+        ),
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help=(
+            "Number of worker processes for batch mode (default: number of CPUs). For a single"
+            " file, parse it in this many processes (default: one)."
+        ),
+    )
+    parser.add_argument(
+        "--near_duplicates",
+        nargs="?",
+        type=float,
+        const=0.8,
+        default=None,
+        metavar="THRESHOLD",
+        help=(
+            "Also remove highlights whose text nearly equals a later highlight, e.g. in another"
+            " edition of the book, at this similarity of their word sequences, above 0 and at most 1"
+            " (default: 0.8). Not available in incremental mode. Requires numpy."
+        ),
+    )
+    parser.add_argument(
+        "--store",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="DB_FILE",
+        help=(
+            "Keep the parsed clippings in an SQLite database (default: '<input_file>.sqlite3')"
+            " and only parse the input file again when it changed."
+        ),
+    )
+    parser.add_argument(
+        "--buffer_size",
+        type=int,
+        default=KindleClippingsProcessor.WRITE_BUFFER_SIZE,
+        help=(
+            "Size in bytes of the output write buffer (default:"
+            f" {KindleClippingsProcessor.WRITE_BUFFER_SIZE})."
+        ),
+    )
+    parser.add_argument(
+        "--timings",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="JSON_FILE",
+        help=(
+            "Print wall time, CPU time, peak RSS and item counts of every stage, and write them"
+            " to JSON_FILE if given."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        metavar="PROF_FILE",
+        help="Run under cProfile and dump the stats to PROF_FILE.",
+    )
+
+    subparsers = parser.add_subparsers(dest="command")
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Search the clipping bodies of the input file for a phrase.",
+        description=(
+            "Search the clipping bodies of the input file for a phrase, using the database of"
+            " --store (which is created or updated first)."
+        ),
+    )
+    search_parser.add_argument("phrase", type=str, help="Phrase to search for.")
+    search_parser.add_argument(
+        "-n",
+        "--limit",
+        type=int,
+        default=10,
+        help="Maximum number of hits to print (default: 10).",
+    )
 
     args = parser.parse_args()
+    if args.near_duplicates is not None and not 0 < args.near_duplicates <= 1:
+        parser.error("--near_duplicates: the threshold must be above 0 and at most 1")
+    if args.merge and not args.batch:
+        parser.error("--merge requires --batch")
+    if args.near_duplicates is not None and args.incremental:
+        parser.error("--near_duplicates cannot be combined with --incremental")
+    timer = StageTimer()
 
-    try:
-        input_path = Path(args.input_file).resolve(strict=True)
-        output_path = Path(args.output_file).resolve()
-
-        processor = KindleClippingsProcessor(input_path)
-        clippings = processor.read_clippings()
-
-        # Interactive book selection
-        book_titles = processor.list_books(clippings)
-        if book_titles:
-            print("Available books:")
-            for i, title in enumerate(book_titles, 1):
-                print(f"{i}. {title}")
-            selection = input(
-                "Enter the number of the book to filter by (or press Enter to process all): "
-            )
-            if selection.isdigit() and 0 < int(selection) <= len(book_titles):
-                selected_book = book_titles[int(selection) - 1]
-                clippings = processor.filter_clippings_by_book(clippings, selected_book)
-                print(f"Selected book for processing: {selected_book}")
-            else:
-                print("Processing all clippings.")
-        else:
-            print("No book titles found in clippings.")
+    with profiled(Path(args.profile) if args.profile else None):
+        try:
+            if args.batch and args.merge:
+                input_paths = find_clippings_files(args.batch)
+                output_path = Path(args.output_file).resolve()
+                with timer.stage("merge") as stage:
+                    total, kept = merge_clippings_files(
+                        input_paths,
+                        output_path,
+                        args.format_style,
+                        args.near_duplicates,
+                        args.buffer_size,
+                    )
+                    stage.items = total
+                print(
+                    f"Merged {len(input_paths)} files ({kept} of {total} clippings kept) into:"
+                    f" {output_path}"
+                )
+                return
 
-        cleaned_clippings = processor.remove_duplicates(clippings)
-        formatted_clippings = processor.apply_formatting(cleaned_clippings, args.format_style)
-        processor.save_cleaned_clippings(output_path, formatted_clippings)
+            if args.batch:
+                input_paths = find_clippings_files(args.batch)
+                output_paths = batch_output_paths(input_paths, Path(args.output_dir).resolve())
+                with timer.stage("batch", len(input_paths)):
+                    results = clean_clippings_files(
+                        input_paths,
+                        output_paths,
+                        args.format_style,
+                        args.workers,
+                        args.near_duplicates,
+                        args.buffer_size,
+                    )
 
-        print(f"Cleaned clippings saved to: {output_path}")
+                for output_path, result in zip(output_paths, results):
+                    if isinstance(result, Exception):
+                        print(f"FAILED  {output_path}: {result}")
+                    else:
+                        total, kept, seconds = result
+                        print(f"{seconds:7.2f}s {output_path} ({kept} of {total} clippings kept)")
+                print(f"Cleaned {len(input_paths)} files into: {Path(args.output_dir).resolve()}")
+                return
 
-    except FileNotFoundError:
-        print(f"Error: The file '{args.input_file}' does not exist. Please check the file path.")
-    except Exception:
-        print(
-            f"An unexpected error occurred:\n{traceback.format_exc()}\nPlease check the inputs and"
-            " try again."
-        )
+            input_path = Path(args.input_file).resolve(strict=True)
+            output_path = Path(args.output_file).resolve()
+
+            processor = KindleClippingsProcessor(input_path)
+
+            if args.command == "search":
+                with ClippingStore(store_path(input_path, args.store)) as store:
+                    with timer.stage("load") as stage:
+                        store.load(processor)
+                        stage.items = len(store)
+                    started = time.perf_counter()
+                    with timer.stage("search") as stage:
+                        hits = store.search(args.phrase, args.limit)
+                        stage.items = len(hits)
+                    milliseconds = (time.perf_counter() - started) * 1000
+
+                for clipping, _ in hits:
+                    if clipping.location is None:
+                        location = "no location"
+                    elif clipping.location_start == clipping.location_end:
+                        location = f"Location {clipping.location_start}"
+                    else:
+                        location = f"Location {clipping.location_start}-{clipping.location_end}"
+                    print(f"{clipping.book_title} | {location}\n    {clipping.body}")
+                print(f"{len(hits)} hits in {milliseconds:.1f} ms")
+                return
+
+            if args.incremental:
+                state_path = (
+                    Path(args.state_file).resolve()
+                    if args.state_file
+                    else output_path.with_name(f"{output_path.name}.state.json")
+                )
+                with timer.stage("incremental") as stage:
+                    written = processor.process_incremental(
+                        output_path, args.format_style, state_path, args.buffer_size
+                    )
+                    stage.items = written
+                print(f"Saved {written} clippings to: {output_path}")
+                return
+
+            with timer.stage("read") as stage:
+                if args.store is not None:
+                    clippings = clippings_source = ClippingStore(store_path(input_path, args.store))
+                    clippings.load(processor)
+                elif args.workers and args.workers > 1:
+                    clippings = processor.read_clippings_parallel(args.workers)
+                    clippings_source = nullcontext(clippings)
+                else:
+                    clippings = clippings_source = processor.map_clippings()
+                stage.items = len(clippings)
+
+            with clippings_source as clippings:
+                # Interactive book selection
+                with timer.stage("list", len(clippings)):
+                    title_index = (
+                        None
+                        if isinstance(clippings, ClippingStore)
+                        else processor.build_title_index(clippings)
+                    )
+                    book_titles = processor.list_books(clippings, title_index)
+                if book_titles:
+                    print("Available books:")
+                    for i, title in enumerate(book_titles, 1):
+                        print(f"{i}. {title}")
+                    selection = input(
+                        "Enter the number of the book to filter by (or press Enter to process"
+                        " all): "
+                    )
+                    if selection.isdigit() and 0 < int(selection) <= len(book_titles):
+                        selected_book = book_titles[int(selection) - 1]
+                        with timer.stage("filter") as stage:
+                            clippings = processor.filter_clippings_by_book(
+                                clippings, selected_book, title_index
+                            )
+                            stage.items = len(clippings)
+                        print(f"Selected book for processing: {selected_book}")
+                    else:
+                        print("Processing all clippings.")
+                else:
+                    print("No book titles found in clippings.")
+
+                with timer.stage("dedup", len(clippings)):
+                    cleaned_clippings = processor.remove_duplicates(clippings)
+                if args.near_duplicates is not None:
+                    with timer.stage("near_dedup", len(cleaned_clippings)):
+                        cleaned_clippings = processor.remove_near_duplicates(
+                            cleaned_clippings, args.near_duplicates
+                        )
+                with timer.stage("write", len(cleaned_clippings)):
+                    processor.write_clippings(
+                        output_path,
+                        cleaned_clippings,
+                        args.format_style,
+                        buffer_size=args.buffer_size,
+                    )
+
+            print(f"Cleaned clippings saved to: {output_path}")
+
+        except FileNotFoundError:
+            print(
+                f"Error: The file '{args.input_file}' does not exist. Please check the file path."
+            )
+        except Exception:
+            print(
+                f"An unexpected error occurred:\n{traceback.format_exc()}\nPlease check the inputs"
+                " and try again."
+            )
+        finally:
+            if args.timings is not None:
+                timer.report(Path(args.timings) if args.timings else None)
 
 
 if __name__ == "__main__":
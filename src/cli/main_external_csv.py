@@ -1,8 +1,111 @@
+import argparse
+import hashlib
+import json
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Iterator, Optional
 
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow
+except ImportError:  # The cache falls back to pickle
+    pyarrow = None
+
+try:
+    from src.cli.stage_timer import StageTimer, profiled
+except ImportError:  # Run as a script from src/cli
+    from stage_timer import StageTimer, profiled
+
+
+def overlaps(loc1: tuple[int, int], loc2: tuple[int, int]) -> bool:
+    # Handles exact overlap and range overlap
+    return loc1 == loc2 or not (loc1[1] <= loc2[0] or loc2[1] <= loc1[0])
+
+
+def latest_positions(
+    books: np.ndarray, starts: np.ndarray, ends: np.ndarray, dates: np.ndarray
+) -> np.ndarray:
+    """Returns the positions of the newest row of every overlap cluster within each book."""
+    clusters = ClippingProcessor.overlap_clusters(starts, ends, books)
+    # Ties keep the earliest row
+    return pd.Series(dates).groupby(clusters).idxmax().to_numpy(dtype=np.int64)
+
+
+def newest_cluster_spans(
+    books: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    dates: np.ndarray,
+    positions: np.ndarray,
+) -> tuple[np.ndarray, ...]:
+    """
+    Reduces rows ordered by position to one row per overlap cluster within each book: the span
+    of the cluster with the date and position of its newest row, still ordered by position. A
+    span overlaps a location exactly when one of the rows of its cluster does, so spans can be
+    swept again together with the rows of the next chunk.
+    """
+    clusters = ClippingProcessor.overlap_clusters(starts, ends, books)
+    grouped_dates = pd.Series(dates).groupby(clusters)
+    # Ties keep the earliest row
+    latest = grouped_dates.idxmax().to_numpy(dtype=np.int64)
+    span_starts = pd.Series(starts).groupby(clusters).min().to_numpy()
+    span_ends = pd.Series(ends).groupby(clusters).max().to_numpy()
+
+    order = np.argsort(positions[latest], kind="stable")
+    latest = latest[order]
+    return books[latest], span_starts[order], span_ends[order], dates[latest], positions[latest]
+
+
+def merge_cluster_spans(
+    spans: tuple[np.ndarray, ...],
+    books: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    dates: np.ndarray,
+    positions: np.ndarray,
+) -> tuple[np.ndarray, ...]:
+    """
+    Merges rows ordered by position, and later than every span, into the books, starts, ends,
+    dates and positions of the cluster spans, sorted by book and location. Spans of a book do not
+    overlap each other, so their ends are sorted too and the spans a row can reach form a run
+    found by `searchsorted`. Only those runs are swept again with the rows, and the resulting
+    spans are inserted back in order.
+    """
+    span_books, span_starts, span_ends, _, span_positions = spans
+    # Locations are int32, so the book and a location fit into one sortable int64 key
+    start_keys = span_books * 2**32 + span_starts
+    low = np.searchsorted(span_books * 2**32 + span_ends, books * 2**32 + starts, side="left")
+    high = np.searchsorted(start_keys, books * 2**32 + ends, side="right")
+    reached = high > low
+    lengths = (high - low)[reached]
+    run_offsets = np.cumsum(lengths) - lengths
+    reached_spans = np.unique(
+        np.repeat(low[reached] - run_offsets, lengths) + np.arange(lengths.sum())
+    )
+    reached_spans = reached_spans[np.argsort(span_positions[reached_spans], kind="stable")]
+
+    swept = [
+        np.concatenate([column[reached_spans], rows])
+        for column, rows in zip(spans, (books, starts, ends, dates, positions))
+    ]
+    merged = newest_cluster_spans(*swept)
+    order = np.lexsort((merged[2], merged[1], merged[0]))
+    merged = [column[order] for column in merged]
+
+    kept = [np.delete(column, reached_spans) for column in spans]
+    kept_keys = np.delete(start_keys, reached_spans)
+    merged_keys = merged[0] * 2**32 + merged[1]
+    # A point span sorts before the span starting at the same location
+    insert_at = np.where(
+        merged[1] == merged[2],
+        np.searchsorted(kept_keys, merged_keys, side="left"),
+        np.searchsorted(kept_keys, merged_keys, side="right"),
+    )
+    return tuple(np.insert(column, insert_at, values) for column, values in zip(kept, merged))
+
 
 class ClippingProcessor:
     GROUP_MAPPING = {
@@ -20,13 +123,131 @@ class ClippingProcessor:
         "MIC": "Micronutrients and Vitamins",
         "W": "Water",
     }
+    BOOK_COLUMNS = ("book", "title")
+    TEXT_DTYPE = "string[pyarrow]" if pyarrow else "string"
+    CSV_DTYPES = {
+        "book": "category",
+        "title": "category",
+        "author": "category",
+        "location": "string",
+        "highlight_text": TEXT_DTYPE,
+        "note_text": TEXT_DTYPE,
+    }
+    LOCATION_PATTERN = r"^\s*(\d+)(?:\s*-\s*(\d+))?\s*$"
+    CATEGORY_PATTERN = re.compile(r"\(([^)]+)\)")
+    CATEGORY_MARKER_PATTERN = re.compile(r"\([^)]+\)\s*")
+    NO_CATEGORY = "No Category"
+    CACHE_VERSION = 2
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(
+        self,
+        file_path: Path,
+        cache_path: Optional[Path] = None,
+        chunksize: Optional[int] = None,
+    ):
+        """With a `chunksize`, the CSV is only read in chunks when duplicates are removed."""
+        self.file_path = file_path
+        self.chunksize = chunksize
+        if chunksize:
+            self.df = None
+        elif cache_path:
+            self.df = self.read_cached(file_path, cache_path)
+        else:
+            self.df = self.read_csv(file_path)
 
-    def __init__(self, file_path: Path):
-        self.df = self.read_csv(file_path)
+    @classmethod
+    def read_csv(cls, file_path: Path) -> pd.DataFrame:
+        """Reads the export with an explicit schema of its columns and parses the dates."""
+        return cls.parse_date_column(pd.read_csv(file_path, dtype=cls.CSV_DTYPES))
+
+    @classmethod
+    def read_csv_chunks(cls, file_path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Reads the export in chunks of rows, the same way as `read_csv`."""
+        with pd.read_csv(file_path, dtype=cls.CSV_DTYPES, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield cls.parse_date_column(chunk)
+
+    @classmethod
+    def parse_date_column(cls, df: pd.DataFrame) -> pd.DataFrame:
+        if "date" in df.columns:
+            df["date"] = cls.parse_dates(df["date"])
+        return df
 
     @staticmethod
-    def read_csv(file_path: Path) -> pd.DataFrame:
-        return pd.read_csv(file_path)
+    def default_cache_path(file_path: Path) -> Path:
+        """Cache next to the CSV, as Parquet if pyarrow is installed and as a pickle otherwise."""
+        return file_path.with_name(f"{file_path.name}.{'parquet' if pyarrow else 'pkl'}")
+
+    def read_cached(self, file_path: Path, cache_path: Path) -> pd.DataFrame:
+        """
+        Returns the prepared frame of the CSV from the cache, or prepares and caches it. The cache
+        is keyed by the size, modification time and hash of the CSV, and the hash is only
+        computed when the modification time changed.
+        """
+        key_path = cache_path.with_name(f"{cache_path.name}.json")
+        stat = file_path.stat()
+        try:
+            key = json.loads(key_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            key = None
+
+        if (
+            key
+            and key.get("version") == self.CACHE_VERSION
+            and key["size"] == stat.st_size
+            and cache_path.exists()
+        ):
+            if key["mtime_ns"] != stat.st_mtime_ns and key["sha256"] == self.file_hash(file_path):
+                key["mtime_ns"] = stat.st_mtime_ns
+                key_path.write_text(json.dumps(key), encoding="utf-8")
+            if key["mtime_ns"] == stat.st_mtime_ns:
+                return self.read_frame(cache_path)
+
+        df = self.prepare(self.read_csv(file_path))
+        self.write_frame(df, cache_path)
+        key = {
+            "version": self.CACHE_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": self.file_hash(file_path),
+        }
+        # The key is written last, so an interrupted write leaves no valid cache
+        key_path.write_text(json.dumps(key), encoding="utf-8")
+        return df
+
+    def file_hash(self, file_path: Path) -> str:
+        digest = hashlib.sha256()
+        with file_path.open("rb") as file:
+            for chunk in iter(lambda: file.read(self.HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def read_frame(cache_path: Path) -> pd.DataFrame:
+        if cache_path.suffix == ".parquet":
+            return pd.read_parquet(cache_path)
+        return pd.read_pickle(cache_path)
+
+    @staticmethod
+    def write_frame(df: pd.DataFrame, cache_path: Path) -> None:
+        if cache_path.suffix == ".parquet":
+            df.to_parquet(cache_path, index=False)
+        else:
+            df.to_pickle(cache_path)
+
+    def prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds the integer location_start and location_end columns, parses the dates and stores the
+        book as a categorical column. Prepared frames are returned unchanged.
+        """
+        if "location_start" not in df.columns:
+            df["location_start"], df["location_end"] = self.parse_locations(df["location"])
+        df = self.clean_date(df)
+        book_column = self.book_column(df)
+        if book_column is not None and not isinstance(df[book_column].dtype, pd.CategoricalDtype):
+            df[book_column] = df[book_column].astype("category")
+        return df
 
     @staticmethod
     def parse_location(location: str) -> tuple[int, int]:
@@ -36,60 +257,215 @@ class ClippingProcessor:
             else (int(location), int(location))
         )
 
+    @classmethod
+    def parse_locations(cls, locations: pd.Series) -> tuple[pd.Series, pd.Series]:
+        """Vectorized `parse_location` of a whole column, returning int32 starts and ends."""
+        parts = locations.astype("string").str.extract(cls.LOCATION_PATTERN)
+        if parts[0].isna().any():
+            invalid = locations[parts[0].isna()].iloc[0]
+            raise ValueError(f"Invalid location: {invalid!r}")
+        starts = parts[0].astype(np.int32)
+        return starts, parts[1].fillna(parts[0]).astype(np.int32)
+
     @staticmethod
     def overlaps(loc1: tuple[int, int], loc2: tuple[int, int]) -> bool:
-        # Handles exact overlap and range overlap
-        return not (loc1[1] <= loc2[0] or loc2[1] <= loc1[0])
+        return overlaps(loc1, loc2)
 
-    def clean_date(self, df: pd.DataFrame) -> pd.DataFrame:
-        df["date"] = pd.to_datetime(
-            df["date"].str.split(" GMT").str[0], format="%a %b %d %Y %H:%M:%S"
+    @staticmethod
+    def overlap_clusters(
+        starts: np.ndarray, ends: np.ndarray, books: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Labels each location with the id of its overlap cluster. Locations are swept per book in
+        order of their start, and a new cluster begins whenever a location starts at or after the
+        furthest end seen so far, unless it repeats the previous location exactly.
+        """
+        if books is None:
+            books = np.zeros(len(starts), dtype=np.int64)
+        order = np.lexsort((ends, starts, books))
+        sorted_books, sorted_starts, sorted_ends = books[order], starts[order], ends[order]
+
+        furthest_end = pd.Series(sorted_ends).groupby(sorted_books).cummax().to_numpy()
+
+        new_book = np.ones(len(order), dtype=bool)
+        new_book[1:] = sorted_books[1:] != sorted_books[:-1]
+        new_cluster = new_book.copy()
+        new_cluster[1:] |= (sorted_starts[1:] >= furthest_end[:-1]) & ~(
+            (sorted_starts[1:] == sorted_starts[:-1]) & (sorted_ends[1:] == sorted_ends[:-1])
         )
+
+        clusters = np.empty(len(order), dtype=np.int64)
+        clusters[order] = np.cumsum(new_cluster) - 1
+        return clusters
+
+    def clean_date(self, df: pd.DataFrame) -> pd.DataFrame:
+        if pd.api.types.is_datetime64_any_dtype(df["date"]):
+            return df
+        df["date"] = self.parse_dates(df["date"])
         return df
 
-    def remove_duplicates(self) -> pd.DataFrame:
+    @staticmethod
+    def parse_dates(dates: pd.Series) -> pd.Series:
+        return pd.to_datetime(dates.str.split(" GMT").str[0], format="%a %b %d %Y %H:%M:%S")
+
+    def book_codes(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Encodes the book of every row as an integer. Exports without a book column are treated as
+        a single book.
+        """
+        book_column = self.book_column(df)
+        if book_column is None:
+            return np.zeros(len(df), dtype=np.int64)
+        return pd.factorize(df[book_column])[0]
+
+    def book_column(self, df: pd.DataFrame) -> Optional[str]:
+        return next((column for column in self.BOOK_COLUMNS if column in df.columns), None)
+
+    def remove_duplicates(self, max_workers: Optional[int] = None) -> pd.DataFrame:
         """
-        Removes duplicate clippings based on overlapping locations, keeping the most recent one.
+        Removes duplicate clippings based on overlapping locations within each book, keeping the
+        most recent one. With `max_workers` above one, books are deduplicated concurrently.
         """
-        self.df["location_start"], self.df["location_end"] = zip(
-            *self.df["location"].apply(self.parse_location)
+        if self.df is None:
+            return self.remove_duplicates_chunked()
+        self.df = self.prepare(self.df)
+
+        columns = (
+            self.book_codes(self.df),
+            self.df["location_start"].to_numpy(),
+            self.df["location_end"].to_numpy(),
+            self.df["date"].to_numpy(),
         )
-        self.df = self.clean_date(self.df)
-        latest_rows = {}
-
-        for idx, row in self.df.iterrows():
-            current_location = (row["location_start"], row["location_end"])
-            if any(self.overlaps(current_location, loc) for loc in latest_rows):
-                overlap_loc = next(
-                    loc for loc in latest_rows if self.overlaps(current_location, loc)
-                )
-                if row["date"] > latest_rows[overlap_loc]["date"]:
-                    del latest_rows[overlap_loc]
-                    latest_rows[current_location] = row
-            else:
-                latest_rows[current_location] = row
-
-        return pd.DataFrame(latest_rows.values()).drop(columns=["location_start", "location_end"])
+        if max_workers and max_workers > 1:
+            latest = self.latest_positions_concurrently(*columns, max_workers=max_workers)
+        else:
+            latest = latest_positions(*columns)
+
+        return self.df.iloc[np.sort(latest)].drop(columns=["location_start", "location_end"])
+
+    def remove_duplicates_chunked(self) -> pd.DataFrame:
+        """
+        Removes duplicates like `remove_duplicates` while reading the CSV in chunks. The first
+        pass merges every chunk into the spans of the overlap clusters of each book, keeping only
+        the position and date of their newest row, and the second pass collects those rows. Memory
+        therefore grows with the number of kept rows rather than with the size of the export, and
+        a chunk only sweeps again the spans its rows reach (see `merge_cluster_spans`).
+        """
+        spans = None
+        book_ids: dict = {}
+        for chunk in self.read_csv_chunks(self.file_path, self.chunksize):
+            if chunk.empty:
+                continue
+            chunk = self.prepare(chunk)
+            columns = (
+                self.chunk_book_codes(chunk, book_ids),
+                chunk["location_start"].to_numpy(dtype=np.int64),
+                chunk["location_end"].to_numpy(dtype=np.int64),
+                chunk["date"].to_numpy(),
+                chunk.index.to_numpy(dtype=np.int64),
+            )
+            if spans is None:
+                spans = tuple(column[:0] for column in columns)
+            spans = merge_cluster_spans(spans, *columns)
+
+        kept_positions = np.sort(spans[4]) if spans is not None else np.empty(0, dtype=np.int64)
+        kept_chunks = []
+        for chunk in self.read_csv_chunks(self.file_path, self.chunksize):
+            if chunk.empty:
+                continue
+            low, high = np.searchsorted(kept_positions, [chunk.index[0], chunk.index[-1] + 1])
+            kept_chunks.append(chunk.loc[kept_positions[low:high]])
+
+        if not kept_chunks:
+            return self.read_csv(self.file_path)
+        df = pd.concat(kept_chunks)
+        # Chunks with different categories are concatenated as objects
+        for column, dtype in self.CSV_DTYPES.items():
+            if column in df.columns and dtype == "category":
+                df[column] = df[column].astype("category")
+        return df
+
+    def chunk_book_codes(self, chunk: pd.DataFrame, book_ids: dict) -> np.ndarray:
+        """Encodes the books of a chunk with the integers assigned to them in earlier chunks."""
+        book_column = self.book_column(chunk)
+        if book_column is None:
+            return np.zeros(len(chunk), dtype=np.int64)
+        codes, books = pd.factorize(chunk[book_column])
+        ids = np.array([book_ids.setdefault(book, len(book_ids)) for book in books], dtype=np.int64)
+        return np.where(codes >= 0, ids[codes] if len(ids) else codes, -1)
+
+    @staticmethod
+    def latest_positions_concurrently(
+        books: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        dates: np.ndarray,
+        max_workers: int,
+    ) -> np.ndarray:
+        """Runs `latest_positions` on batches of whole books in a process pool."""
+        # A few batches per worker keeps the pool busy when book sizes differ
+        batch_count = min(max_workers * 4, books.max(initial=0) + 1)
+        row_batches = books % batch_count
+        order = np.argsort(row_batches, kind="stable")
+        batches = np.split(order, np.searchsorted(row_batches[order], np.arange(1, batch_count)))
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                latest_positions,
+                [books[batch] for batch in batches],
+                [starts[batch] for batch in batches],
+                [ends[batch] for batch in batches],
+                [dates[batch] for batch in batches],
+            )
+            return np.concatenate([batch[positions] for batch, positions in zip(batches, results)])
 
     def categorize_notes(self, df: pd.DataFrame) -> pd.DataFrame:
         """Extracts categories and cleans the note text."""
-        df["categories"] = df["note_text"].apply(self.extract_categories)
-        df["note_text"] = df["note_text"].apply(self.strip_categories_from_note)
+        notes = df["note_text"].astype("string")
+        df["categories"] = self.extract_all_categories(notes)
+        df["note_text"] = notes.str.replace(self.CATEGORY_MARKER_PATTERN.pattern, "", regex=True)
         return df
 
+    def extract_all_categories(self, notes: pd.Series) -> list[list[list[str]]]:
+        """
+        Vectorized `extract_categories` of a whole column. The codes of all notes are factorized
+        so that each distinct code is split into its hierarchy and looked up in `GROUP_MAPPING`
+        only once, and notes with the same code share its hierarchy list.
+        """
+        notes = pd.Series(notes.to_numpy(), dtype="string")
+        codes = notes.str.findall(self.CATEGORY_PATTERN).explode().dropna()
+        codes = codes.str.split(",").explode().str.strip()
+        categories = [None] * len(notes)
+        if len(codes):
+            code_ids, unique_codes = pd.factorize(codes)
+            hierarchies = [
+                [self.GROUP_MAPPING.get(level.strip(), level.strip()) for level in code.split(">")]
+                for code in unique_codes
+            ]
+            code_hierarchies = [hierarchies[code_id] for code_id in code_ids.tolist()]
+            rows = codes.index.to_numpy()
+            row_starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            row_ends = np.r_[row_starts[1:], len(rows)]
+            for row, start, end in zip(
+                rows[row_starts].tolist(), row_starts.tolist(), row_ends.tolist()
+            ):
+                categories[row] = code_hierarchies[start:end]
+
+        return [[[self.NO_CATEGORY]] if found is None else found for found in categories]
+
     def extract_categories(self, note: str) -> list[list[str]]:
         """Extracts categories from notes, handling both predefined and custom categories."""
-        matches = re.findall(r"\(([^)]+)\)", note) if isinstance(note, str) else []
+        matches = self.CATEGORY_PATTERN.findall(note) if isinstance(note, str) else []
         return [
             [self.GROUP_MAPPING.get(sub.strip(), sub.strip()) for sub in code.split(">")]
             for group_codes in matches
             for code in group_codes.split(",")
-        ] or [["No Category"]]
+        ] or [[self.NO_CATEGORY]]
 
-    @staticmethod
-    def strip_categories_from_note(note: str) -> str:
+    @classmethod
+    def strip_categories_from_note(cls, note: str) -> str:
         """Cleans category markers from note text."""
-        return re.sub(r"\([^)]+\)\s*", "", note) if isinstance(note, str) else note
+        return cls.CATEGORY_MARKER_PATTERN.sub("", note) if isinstance(note, str) else note
 
 
 class MarkdownExporter:
@@ -103,18 +479,27 @@ class MarkdownExporter:
             self.write_categories(category_dict, f)
 
     def build_category_tree(self) -> dict:
-        """Builds a nested dictionary structure for categories and notes."""
+        """
+        Builds a nested dictionary structure for categories and notes. The rows are exploded into
+        one row per category hierarchy and grouped by its path, so the tree is walked once per
+        distinct path. Categories and notes keep the order in which they first appear.
+        """
         category_tree = {}
+        exploded = (
+            self.df[["categories", "highlight_text", "note_text"]]
+            .explode("categories")
+            .dropna(subset=["categories"])
+            .reset_index(drop=True)
+        )
+        paths = exploded["categories"].map(tuple)
+        notes = exploded[["highlight_text", "note_text"]].to_dict("records")
+        positions = exploded.groupby(paths, sort=False).indices
 
-        def add_to_tree(categories, highlight, note):
+        for path in paths.unique():
             current_level = category_tree
-            for cat in categories:
+            for cat in path:
                 current_level = current_level.setdefault(cat, {"notes": []})
-            current_level["notes"].append({"highlight_text": highlight, "note_text": note})
-
-        for _, row in self.df.iterrows():
-            for category_hierarchy in row["categories"]:
-                add_to_tree(category_hierarchy, row["highlight_text"], row["note_text"])
+            current_level["notes"].extend(notes[position] for position in positions[path])
 
         return category_tree
 
@@ -125,7 +510,7 @@ class MarkdownExporter:
                 f.write(f"{'#' * level} {category}\n")
                 for note in content.get("notes", []):
                     f.write(f'* {note["highlight_text"]}\n')
-                    if note["note_text"]:
+                    if not pd.isna(note["note_text"]) and note["note_text"]:
                         f.write(f'\n  **Note**: *{note["note_text"]}*\n')
                 self.write_categories(content, f, level + 1)
 
@@ -133,18 +518,103 @@ class MarkdownExporter:
 def main():
     # Usage:
     # 1. Go to https://www.mykindletools.com/kindle-clipping-export and export CSV file
-    # 2. Move downloaded files to `data/` directory, replace the path below and execute
-    #    with active poetry venv: `python src/cli/main_external_csv.py`
+    # 2. Move downloaded files to `data/` directory, pass the path (or replace the default below)
+    #    and execute with active poetry venv: `python src/cli/main_external_csv.py -i <file>`
+
+    default_input_file = "data/happiness_clippings.csv"
+    default_output_file = "data/exported_notes.md"
 
-    file_path = Path("data/happiness_clippings.csv")
-    output_file = Path("data/exported_notes.md")
+    parser = argparse.ArgumentParser(description="Export categorized Kindle notes to Markdown.")
+    parser.add_argument(
+        "-i",
+        "--input_file",
+        type=str,
+        default=default_input_file,
+        help=f"Path to the mykindletools CSV export (default: {default_input_file}).",
+    )
+    parser.add_argument(
+        "-o",
+        "--output_file",
+        type=str,
+        default=default_output_file,
+        help=f"Path to the exported Markdown file (default: {default_output_file}).",
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="CACHE_FILE",
+        help=(
+            "Load the parsed CSV from a cache, created on the first run and refreshed when the"
+            " CSV changes (default: '<input_file>.parquet', or '.pkl' without pyarrow)."
+        ),
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help=(
+            "Read the CSV in chunks of this many rows to remove duplicates with bounded memory"
+            " (ignores --cache)."
+        ),
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help=(
+            "Remove duplicates of different books in this many worker processes (default: one;"
+            " ignored with --chunksize)."
+        ),
+    )
+    parser.add_argument(
+        "--timings",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="JSON_FILE",
+        help=(
+            "Print wall time, CPU time, peak RSS and item counts of every stage, and write them"
+            " to JSON_FILE if given."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        metavar="PROF_FILE",
+        help="Run under cProfile and dump the stats to PROF_FILE.",
+    )
+    args = parser.parse_args()
+
+    file_path = Path(args.input_file)
+    output_file = Path(args.output_file)
+    cache_path = None
+    if args.cache is not None:
+        cache_path = (
+            Path(args.cache) if args.cache else ClippingProcessor.default_cache_path(file_path)
+        )
+    timer = StageTimer()
 
-    processor = ClippingProcessor(file_path)
-    deduped_df = processor.remove_duplicates()
-    categorized_df = processor.categorize_notes(deduped_df)
+    with profiled(Path(args.profile) if args.profile else None):
+        try:
+            with timer.stage("read_csv") as stage:
+                processor = ClippingProcessor(file_path, cache_path, args.chunksize)
+                stage.items = None if processor.df is None else len(processor.df)
+            with timer.stage("dedup", stage.items):
+                deduped_df = processor.remove_duplicates(max_workers=args.workers)
+            with timer.stage("categorize", len(deduped_df)):
+                categorized_df = processor.categorize_notes(deduped_df)
 
-    exporter = MarkdownExporter(categorized_df, output_file)
-    exporter.export()
+            with timer.stage("export", len(categorized_df)):
+                exporter = MarkdownExporter(categorized_df, output_file)
+                exporter.export()
+        finally:
+            # The stage that failed is recorded too
+            if args.timings is not None:
+                timer.report(Path(args.timings) if args.timings else None)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:
+    from src.cli.clipping import Clipping
+except ImportError:  # Run as a script from src/cli
+    from clipping import Clipping
+
+if TYPE_CHECKING:
+    from src.cli.main import KindleClippingsProcessor
+
+
+class TitleIndex:
+    """Positions of the clippings of every book, in file order."""
+
+    def __init__(self):
+        self._positions: Dict[str, List[int]] = {}
+        self._highlighted_books: Set[str] = set()
+
+    def add(self, position: int, book_title: str, is_highlight: bool) -> None:
+        """Record the position of a clipping of the book."""
+
+        self._positions.setdefault(book_title, []).append(position)
+        if is_highlight:
+            self._highlighted_books.add(book_title)
+
+    def positions(self, book_title: str) -> List[int]:
+        """Positions of all clippings of the book."""
+
+        return self._positions.get(book_title, [])
+
+    def books(self) -> List[str]:
+        """Sorted titles of the books that have at least one highlight."""
+
+        return sorted(self._highlighted_books)
+
+
+class MappedClippings(Sequence):
+    """
+    Read-only sequence of the clippings of a memory-mapped 'My Clippings.txt'.
+
+    Entry boundaries are located by searching the raw bytes for the delimiter, and an entry is
+    only decoded and parsed when it is accessed. Headers can be decoded on their own, so listing
+    or selecting books does not decode the highlight text of the whole file.
+    """
+
+    DELIMITER = b"=========="
+    NON_WHITESPACE = re.compile(rb"\S")
+
+    def __init__(self, processor: "KindleClippingsProcessor", file_path: Optional[Path] = None):
+        self._processor = processor
+        self._file = open(file_path or processor.file_path, "rb")
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._map = b""
+        self.spans = self._find_spans()
+        self.locale = processor.locale or processor.detect_locale(
+            self._decode_header(start, end)
+            for start, end in self.spans[: processor.LOCALE_SAMPLE_SIZE]
+        )
+        self._title_index: Optional[TitleIndex] = None
+
+    def __enter__(self) -> "MappedClippings":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __getitem__(self, position: int) -> Clipping:
+        start, end = self.spans[position]
+        return self._processor.parse_clipping(self._decode(start, end), self.locale)
+
+    @property
+    def title_index(self) -> TitleIndex:
+        """Title index built from the entry headers on first use."""
+
+        if self._title_index is None:
+            self._title_index = TitleIndex()
+            for position, book_title, kind in self.iter_headers():
+                self._title_index.add(position, book_title, kind == Clipping.HIGHLIGHT)
+        return self._title_index
+
+    def iter_headers(self) -> Iterator[Tuple[int, str, str]]:
+        """Yield the position, book title and kind of every entry, decoding only its header."""
+
+        for position, (start, end) in enumerate(self.spans):
+            book_title, kind = self._processor.parse_header(
+                self._decode_header(start, end), self.locale
+            )
+            yield position, book_title, kind
+
+    def _decode_header(self, start: int, end: int) -> str:
+        """Decode the first two lines of the entry in the byte range."""
+
+        first_line_end = self._map.find(b"\n", start, end)
+        header_end = self._map.find(b"\n", first_line_end + 1, end) if first_line_end != -1 else -1
+        return self._decode(start, end if header_end == -1 else header_end)
+
+    def _decode(self, start: int, end: int) -> str:
+        """Decode a slice of the file the way a text-mode read would."""
+
+        return self._map[start:end].decode("utf-8").replace("\r\n", "\n")
+
+    def _find_spans(self) -> List[Tuple[int, int]]:
+        """Find the byte ranges of all non-blank entries."""
+
+        spans = []
+        start = position = 0
+        while True:
+            position = self._map.find(self.DELIMITER, position)
+            if position == -1:
+                break
+
+            delimiter_end = position + len(self.DELIMITER)
+            if self._map[delimiter_end : delimiter_end + 1] == b"\n":
+                line_end = delimiter_end + 1
+            elif self._map[delimiter_end : delimiter_end + 2] == b"\r\n":
+                line_end = delimiter_end + 2
+            else:
+                position += 1
+                continue
+
+            if self.NON_WHITESPACE.search(self._map, start, position):
+                spans.append((start, position))
+            start = position = line_end
+
+        if self.NON_WHITESPACE.search(self._map, start, len(self._map)):
+            spans.append((start, len(self._map)))
+        return spans
@@ -0,0 +1,169 @@
+import re
+import zlib
+from typing import Dict, List, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Only needed to remove near-duplicates
+    np = None
+
+
+class MinHashIndex:
+    """
+    Clusters of near-identical texts, found by locality-sensitive hashing of MinHash signatures.
+
+    Every text is reduced to the hashes of its word shingles, and a signature keeps the minimum
+    of each of up to PERMUTATIONS random hash permutations of them. The signatures are cut into
+    bands, and texts sharing a band are candidates, so clustering takes about linear time. The
+    bands are shaped from the threshold so that texts at the threshold become candidates with
+    at least MIN_CANDIDATE_PROBABILITY, and a candidate only joins a cluster if the Jaccard
+    similarity of its shingles reaches the threshold.
+    """
+
+    SHINGLE_SIZE = 3
+    PERMUTATIONS = 128
+    MIN_CANDIDATE_PROBABILITY = 0.99
+    PRIME = (1 << 31) - 1
+    BATCH_SIZE = 1024
+    WORD_PATTERN = re.compile(r"\w+")
+
+    def __init__(self, threshold: float = 0.8, seed: int = 0):
+        if np is None:
+            raise ImportError("Removing near-duplicates requires numpy.")
+        if not 0 < threshold <= 1:
+            raise ValueError(f"The similarity threshold must be above 0 and at most 1: {threshold}")
+
+        self.threshold = threshold
+        self.bands, self.rows = self.band_shape(threshold)
+        rng = np.random.default_rng(seed)
+        permutations = self.bands * self.rows
+        self._multipliers = rng.integers(1, self.PRIME, (permutations, 1), dtype=np.uint64)
+        self._increments = rng.integers(0, self.PRIME, (permutations, 1), dtype=np.uint64)
+
+    @classmethod
+    def band_shape(cls, threshold: float) -> Tuple[int, int]:
+        """
+        The number of bands and rows per band for a threshold. More rows per band make chance
+        candidates rarer, so the most rows are taken that still make texts at the threshold
+        candidates with at least MIN_CANDIDATE_PROBABILITY.
+        """
+
+        for rows in range(cls.PERMUTATIONS, 1, -1):
+            bands = cls.PERMUTATIONS // rows
+            if 1 - (1 - threshold**rows) ** bands >= cls.MIN_CANDIDATE_PROBABILITY:
+                return bands, rows
+        return cls.PERMUTATIONS, 1
+
+    def signatures(self, texts: Sequence[str]) -> "np.ndarray":
+        """
+        MinHash signatures of the texts, one row per text. Texts without words have no shingles,
+        and their rows are filled with PRIME, above any hash value.
+        """
+
+        signatures = np.full((len(texts), self.bands * self.rows), self.PRIME, dtype=np.uint64)
+        word_hashes: Dict[str, int] = {}
+        padding = [0] * (self.SHINGLE_SIZE - 1)
+
+        for batch_start in range(0, len(texts), self.BATCH_SIZE):
+            batch = texts[batch_start : batch_start + self.BATCH_SIZE]
+            hashes: List[int] = []
+            lengths, counts = [], []
+            for text in batch:
+                words = self.WORD_PATTERN.findall(text.lower())
+                if not words:
+                    lengths.append(0)
+                    counts.append(0)
+                    continue
+                for word in words:
+                    if word not in word_hashes:
+                        word_hashes[word] = zlib.crc32(word.encode())
+                    hashes.append(word_hashes[word])
+                # Padding keeps the shingles of a text from running into the next one
+                hashes.extend(padding)
+                lengths.append(len(words) + len(padding))
+                counts.append(max(len(words) - len(padding), 1))
+
+            counts = np.array(counts)
+            worded = counts > 0
+            if not worded.any():
+                continue
+
+            shingles = self._fold(np.array(hashes, dtype=np.uint64), self.SHINGLE_SIZE)
+            text_offsets = np.cumsum([0] + lengths[:-1])
+            shingle_offsets = np.cumsum(np.r_[0, counts[:-1]])
+            starts = np.repeat(text_offsets - shingle_offsets, counts) + np.arange(counts.sum())
+            permuted = (
+                self._multipliers * (shingles[starts] % self.PRIME) + self._increments
+            ) % self.PRIME
+            batch_signatures = signatures[batch_start : batch_start + len(batch)]
+            # Texts without shingles are left out, as reduceat cannot take empty segments
+            batch_signatures[worded] = np.minimum.reduceat(
+                permuted, shingle_offsets[worded], axis=1
+            ).T
+
+        return signatures
+
+    def shingles(self, text: str) -> Set[Tuple[str, ...]]:
+        """The word shingles of a text; a text shorter than a shingle is a single shingle."""
+
+        words = self.WORD_PATTERN.findall(text.lower())
+        if not words:
+            return set()
+        return {
+            tuple(words[start : start + self.SHINGLE_SIZE])
+            for start in range(max(len(words) - self.SHINGLE_SIZE + 1, 1))
+        }
+
+    def clusters(self, texts: Sequence[str]) -> List[int]:
+        """Label every text with the position of a text of its cluster."""
+
+        signatures = self.signatures(texts)
+        parents = list(range(len(texts)))
+        worded = np.flatnonzero(signatures[:, 0] < self.PRIME)
+        shingles: Dict[int, Set[Tuple[str, ...]]] = {}
+
+        def find(position: int) -> int:
+            while parents[position] != position:
+                parents[position] = parents[parents[position]]
+                position = parents[position]
+            return position
+
+        def similarity(first: int, second: int) -> float:
+            for position in (first, second):
+                if position not in shingles:
+                    shingles[position] = self.shingles(texts[position])
+            return len(shingles[first] & shingles[second]) / len(shingles[first] | shingles[second])
+
+        for band in range(self.bands):
+            band_rows = signatures[worded, band * self.rows : (band + 1) * self.rows]
+            keys = self._fold(band_rows.T, self.rows).ravel()
+            band_order = np.argsort(keys, kind="stable")
+            order, sorted_keys = worded[band_order], keys[band_order]
+            bucket_starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+            bucket_ends = np.r_[bucket_starts[1:], len(keys)]
+
+            # Only buckets holding more than one text contain candidates
+            shared = bucket_ends - bucket_starts > 1
+            for bucket_start, bucket_end in zip(bucket_starts[shared], bucket_ends[shared]):
+                members = order[bucket_start:bucket_end].tolist()
+                for i, position in enumerate(members):
+                    for member in members[:i]:
+                        if find(member) == find(position):
+                            break
+                        if similarity(member, position) >= self.threshold:
+                            parents[find(member)] = find(position)
+                            break
+
+        return [find(position) for position in range(len(texts))]
+
+    @staticmethod
+    def _fold(values: "np.ndarray", width: int) -> "np.ndarray":
+        """Combine every `width` consecutive values along the first axis into one hash."""
+
+        folded = values[: len(values) - width + 1].copy()
+        for offset in range(1, width):
+            folded = (
+                folded * np.uint64(0x9E3779B97F4A7C15)
+                + values[offset : len(values) - width + 1 + offset]
+            )
+        return folded
@@ -0,0 +1,113 @@
+import cProfile
+import json
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss_bytes(children: bool = False) -> Optional[int]:
+    """
+    Return the peak resident set size of the process so far, if the platform reports it. With
+    `children`, return the largest peak of its finished child processes instead, e.g. the workers
+    of a process pool after it was shut down.
+    """
+
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Stage:
+    """Measurements of a single pipeline stage."""
+
+    def __init__(self, name: str, items: Optional[int] = None):
+        self.name = name
+        self.items = items
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_rss_bytes: Optional[int] = None
+        self.peak_child_rss_bytes: Optional[int] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "stage": self.name,
+            "items": self.items,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "peak_child_rss_bytes": self.peak_child_rss_bytes,
+        }
+
+
+class StageTimer:
+    """
+    Record wall time, CPU time, peak RSS and item counts of pipeline stages. CPU time covers the
+    main process only, while the peak RSS of finished worker processes is reported separately.
+    """
+
+    def __init__(self):
+        self.stages: List[Stage] = []
+
+    @contextmanager
+    def stage(self, name: str, items: Optional[int] = None) -> Iterator[Stage]:
+        """Measure the enclosed block. The item count can also be set on the yielded stage."""
+
+        stage = Stage(name, items)
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        try:
+            yield stage
+        finally:
+            stage.wall_seconds = time.perf_counter() - wall_started
+            stage.cpu_seconds = time.process_time() - cpu_started
+            stage.peak_rss_bytes = peak_rss_bytes()
+            stage.peak_child_rss_bytes = peak_rss_bytes(children=True)
+            self.stages.append(stage)
+
+    def report(self, json_path: Optional[Path] = None) -> None:
+        """Print the stages as a table and optionally write them as JSON."""
+
+        print(
+            f"{'stage':<14}{'items':>10}{'wall s':>10}{'cpu s':>10}{'peak RSS MiB':>14}"
+            f"{'child RSS MiB':>15}"
+        )
+        for stage in self.stages:
+            items = "-" if stage.items is None else stage.items
+            rss, child_rss = (
+                "-" if peak is None else f"{peak / 2**20:.1f}"
+                for peak in (stage.peak_rss_bytes, stage.peak_child_rss_bytes)
+            )
+            print(
+                f"{stage.name:<14}{items:>10}{stage.wall_seconds:>10.3f}"
+                f"{stage.cpu_seconds:>10.3f}{rss:>14}{child_rss:>15}"
+            )
+
+        if json_path:
+            with open(json_path, "w", encoding="utf-8") as file:
+                json.dump([stage.as_dict() for stage in self.stages], file, indent=2)
+
+
+@contextmanager
+def profiled(output_path: Optional[Path]) -> Iterator[None]:
+    """Run the enclosed block under cProfile and dump the stats, if an output path is given."""
+
+    if output_path is None:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output_path)
@@ -0,0 +1,53 @@
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.cli.appended_data import complete_length, read_appended_data
+
+FIRST = b"Book\n- Your Note on Location 1 | Added on Date\n\nfirst\n==========\n"
+SECOND = b"Book\r\n- Your Note on Location 2 | Added on Date\r\n\r\nsecond\r\n==========\r\n"
+PARTIAL = b"Book\n- Your Note on Location 3"
+
+
+class TestReadAppendedData(unittest.TestCase):
+    def setUp(self):
+        """Set up a clippings file with a complete entry."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "My Clippings.txt"
+        self.file_path.write_bytes(FIRST)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_complete_length(self):
+        """Test that data is complete up to the last delimiter line with either line ending."""
+        self.assertEqual(complete_length(FIRST + PARTIAL), len(FIRST))
+        self.assertEqual(complete_length(FIRST + SECOND + PARTIAL), len(FIRST + SECOND))
+        self.assertEqual(complete_length(PARTIAL), 0)
+
+    def test_reads_after_unchanged_prefix(self):
+        """Test that only the data after an unchanged prefix is read and split."""
+        first = read_appended_data(self.file_path)
+        self.assertEqual((first.offset, first.complete, first.incomplete), (0, FIRST, b""))
+        self.assertEqual(first.prefix_hash, hashlib.sha256(FIRST).hexdigest())
+
+        self.file_path.write_bytes(FIRST + SECOND + PARTIAL)
+        appended = read_appended_data(self.file_path, len(FIRST), first.prefix_hash)
+        self.assertEqual(appended.offset, len(FIRST))
+        self.assertEqual((appended.complete, appended.incomplete), (SECOND, PARTIAL))
+        self.assertEqual(appended.prefix_hash, hashlib.sha256(FIRST + SECOND).hexdigest())
+
+    def test_changed_or_truncated_prefix_reads_whole_file(self):
+        """Test that the whole file is read again if its processed part changed."""
+        prefix_hash = read_appended_data(self.file_path).prefix_hash
+        for data in (SECOND + FIRST, FIRST[:10]):
+            with self.subTest(data=data):
+                self.file_path.write_bytes(data)
+                appended = read_appended_data(self.file_path, len(FIRST), prefix_hash)
+                self.assertEqual(appended.offset, 0)
+                self.assertEqual(appended.complete + appended.incomplete, data)
+
+
+if __name__ == "__main__":
+    unittest.main()
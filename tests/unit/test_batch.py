@@ -0,0 +1,62 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.cli.main import batch_output_paths, clean_clippings_files, find_clippings_files
+
+ENTRIES = (
+    "Book (Author)\n- Your Highlight on Location 100-110 | Added on Date\n\nshort\n==========\n"
+    "Book (Author)\n- Your Highlight on Location 100-115 | Added on Date\n\nlonger\n==========\n"
+)
+
+
+class TestBatchMode(unittest.TestCase):
+    def setUp(self):
+        """Set up clippings files of two devices in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        for device in ["device1", "device2"]:
+            (self.root / "inputs" / device).mkdir(parents=True)
+            (self.root / "inputs" / device / "My Clippings.txt").write_text(ENTRIES, "utf-8")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_find_files(self):
+        """Test finding clippings files in a directory and with a glob pattern."""
+        expected = [
+            (self.root / "inputs" / device / "My Clippings.txt").resolve()
+            for device in ["device1", "device2"]
+        ]
+        self.assertEqual(find_clippings_files(str(self.root / "inputs")), expected)
+        self.assertEqual(find_clippings_files(str(self.root / "inputs" / "*" / "*.txt")), expected)
+
+    def test_output_paths_mirror_inputs(self):
+        """Test that outputs keep the relative layout and never overwrite inputs."""
+        input_paths = find_clippings_files(str(self.root / "inputs"))
+        output_paths = batch_output_paths(input_paths, self.root / "out")
+        self.assertEqual(
+            output_paths,
+            [self.root / "out" / device / "My Clippings.txt" for device in ["device1", "device2"]],
+        )
+        with self.assertRaises(ValueError):
+            batch_output_paths(input_paths, self.root / "inputs")
+
+    def test_clean_files(self):
+        """Test cleaning files in a pool, reporting a broken file without stopping the batch."""
+        (self.root / "inputs" / "device3").mkdir()
+        (self.root / "inputs" / "device3" / "My Clippings.txt").write_bytes(b"\xff\xfe broken")
+        input_paths = find_clippings_files(str(self.root / "inputs"))
+        output_paths = batch_output_paths(input_paths, self.root / "out")
+
+        results = clean_clippings_files(input_paths, output_paths, "bullet", workers=2)
+
+        self.assertEqual([result[:2] for result in results[:2]], [(2, 1), (2, 1)])
+        self.assertIsInstance(results[2], UnicodeDecodeError)
+        self.assertEqual(
+            output_paths[0].read_text("utf-8"), "=========== Book (Author) ===========\n* longer\n"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
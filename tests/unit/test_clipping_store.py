@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.cli.clipping_store import ClippingStore
+from src.cli.main import KindleClippingsProcessor
+
+ENTRIES = [
+    "Book A (Author)\n- Your Highlight on Location 100-110 | Added on Sunday, February 5, 2017"
+    " 9:21:58 PM\n\nfirst\n",
+    "Book B\n- Your Note on page 3 | Location 5 | Added on Date\n\nnote\n",
+    "Book A (Author)\n- Your Highlight on Location 100-120 | Added on Date\n\nlonger\n",
+    "Book C (Author)\n- Your Bookmark on Location 7 | Added on Date\n\n\n",
+]
+
+
+class TestClippingStore(unittest.TestCase):
+    def setUp(self):
+        """Set up a clippings file and a store in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        directory = Path(self.temp_dir.name)
+        self.file_path = directory / "My Clippings.txt"
+        self.file_path.write_text("".join(e + "==========\n" for e in ENTRIES), encoding="utf-8")
+        self.processor = KindleClippingsProcessor(self.file_path)
+        self.store = ClippingStore(directory / "My Clippings.txt.sqlite3")
+        self.store.load(self.processor)
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Test that stored clippings equal the parsed ones, in file order."""
+        clippings = self.processor.read_clippings()
+        self.assertEqual(list(self.store), clippings)
+        self.assertEqual(list(reversed(self.store)), clippings[::-1])
+        self.assertEqual((len(self.store), self.store[1], self.store[-1]), (4, *clippings[1::2]))
+
+    def test_books_and_filter(self):
+        """Test listing and filtering books with queries."""
+        clippings = self.processor.read_clippings()
+        self.assertEqual(
+            self.processor.list_books(self.store), self.processor.list_books(clippings)
+        )
+        self.assertEqual(
+            self.processor.filter_clippings_by_book(self.store, "Book A (Author)"),
+            [clippings[0], clippings[2]],
+        )
+        self.assertEqual(
+            self.processor.filter_clippings_by_book(self.store, "Book B"), [clippings[1]]
+        )
+
+    def test_remove_duplicates(self):
+        """Test that deduplicating the store keeps the same clippings as the file."""
+        expected = self.processor.remove_duplicates(self.processor.read_clippings())
+        self.processor.book_highlights = {}
+        self.assertEqual(self.processor.remove_duplicates(self.store), expected)
+
+    def test_reload_only_when_changed(self):
+        """Test that an unchanged file is not parsed again."""
+        self.assertFalse(self.store.load(self.processor))
+        with open(self.file_path, "a", encoding="utf-8") as file:
+            file.write(ENTRIES[0] + "==========\n")
+        stat = self.file_path.stat()
+        os.utime(self.file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        self.assertTrue(self.store.load(self.processor))
+        self.assertEqual(len(self.store), 5)
+
+    def test_appended_entries(self):
+        """Test that appended entries, including an unfinished one, are loaded incrementally."""
+        with open(self.file_path, "a", encoding="utf-8") as file:
+            file.write(ENTRIES[1])
+        self.assertTrue(self.store.load(self.processor))
+        self.assertEqual(len(self.store), 5)
+
+        with open(self.file_path, "a", encoding="utf-8") as file:
+            file.write("==========\n" + ENTRIES[3] + "==========\n")
+        self.assertTrue(self.store.load(self.processor))
+        self.assertEqual(list(self.store), self.processor.read_clippings())
+
+    def test_rewritten_file(self):
+        """Test that the whole file is loaded again when its loaded part changed."""
+        self.file_path.write_text(ENTRIES[3] + "==========\n" * 5, encoding="utf-8")
+        self.assertTrue(self.store.load(self.processor))
+        self.assertEqual(list(self.store), self.processor.read_clippings())
+
+    def test_search(self):
+        """Test that phrase search finds bodies regardless of case and ranks the hits."""
+        hits = self.store.search("LONGER")
+        self.assertEqual([clipping.body for clipping, _ in hits], ["longer"])
+        self.assertEqual([clipping.body for clipping, _ in self.store.search("not there")], [])
+        self.assertEqual(self.store.search(" "), [])
+
+        with open(self.file_path, "a", encoding="utf-8") as file:
+            file.write(ENTRIES[2].replace("longer", "longer longer") + "==========\n")
+        self.store.load(self.processor)
+        hits = self.store.search("longer")
+        self.assertEqual([clipping.body for clipping, _ in hits], ["longer longer", "longer"])
+        self.assertLessEqual(hits[0][1], hits[1][1])
+
+    def test_search_without_full_text(self):
+        """Test that the LIKE fallback matches wildcard characters literally."""
+        with open(self.file_path, "a", encoding="utf-8") as file:
+            file.write(ENTRIES[2].replace("longer", "100% a_b") + "==========\n")
+        self.store.load(self.processor)
+        self.store.full_text = False
+
+        self.assertEqual([clipping.body for clipping, _ in self.store.search("LONGER")], ["longer"])
+        self.assertEqual(
+            [clipping.body for clipping, _ in self.store.search("0% a_")], ["100% a_b"]
+        )
+        self.assertEqual(self.store.search("%"), self.store.search("0%"))
+        self.assertEqual(self.store.search("_"), self.store.search("a_b"))
+        self.assertEqual(self.store.search("\\"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
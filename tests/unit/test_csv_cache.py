@@ -0,0 +1,68 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.cli.main_external_csv import ClippingProcessor
+
+COLUMNS = ["book", "location", "date", "highlight_text", "note_text"]
+DATE = "Sun Feb 05 2017 21:21:58 GMT+0100 (Central European Standard Time)"
+ROWS = [
+    ("Book A", "100-110", DATE, "a", "(P)"),
+    ("Book B", "5", DATE, "b", ""),
+    ("Book A", "105-115", DATE, "c", ""),
+]
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    file_path = tmp_path / "clippings.csv"
+    pd.DataFrame(ROWS, columns=COLUMNS).to_csv(file_path, index=False)
+    return file_path
+
+
+def fail_read_csv(file_path):
+    raise AssertionError("The CSV was parsed again")
+
+
+def test_prepared_frame_is_cached(csv_path, monkeypatch):
+    cache_path = ClippingProcessor.default_cache_path(csv_path)
+    df = ClippingProcessor(csv_path, cache_path).df
+    assert cache_path.exists()
+    assert list(df["location_start"]) == [100, 5, 105]
+    assert list(df["location_end"]) == [110, 5, 115]
+    assert pd.api.types.is_datetime64_any_dtype(df["date"])
+    assert isinstance(df["book"].dtype, pd.CategoricalDtype)
+
+    monkeypatch.setattr(ClippingProcessor, "read_csv", staticmethod(fail_read_csv))
+    pd.testing.assert_frame_equal(ClippingProcessor(csv_path, cache_path).df, df)
+
+
+def test_touched_csv_uses_cache(csv_path, monkeypatch):
+    cache_path = ClippingProcessor.default_cache_path(csv_path)
+    ClippingProcessor(csv_path, cache_path)
+    stat = csv_path.stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    monkeypatch.setattr(ClippingProcessor, "read_csv", staticmethod(fail_read_csv))
+    assert len(ClippingProcessor(csv_path, cache_path).df) == 3
+
+
+def test_changed_csv_is_parsed_again(csv_path):
+    cache_path = ClippingProcessor.default_cache_path(csv_path)
+    ClippingProcessor(csv_path, cache_path)
+    pd.DataFrame(ROWS[:2], columns=COLUMNS).to_csv(csv_path, index=False)
+    assert len(ClippingProcessor(csv_path, cache_path).df) == 2
+
+
+def test_cached_dedup_matches_uncached(csv_path):
+    cache_path = ClippingProcessor.default_cache_path(csv_path)
+    ClippingProcessor(csv_path, cache_path)
+    cached = ClippingProcessor(csv_path, cache_path).remove_duplicates()
+    uncached = ClippingProcessor(csv_path).remove_duplicates()
+    pd.testing.assert_frame_equal(cached, uncached)
+    assert list(cached["highlight_text"]) == ["a", "b"]
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from src.cli.main_external_csv import ClippingProcessor
+
+NOTES = [
+    "(P) protein note",
+    "(P,F) two groups",
+    "(P>Custom, W) (N) nested and several markers",
+    "( FIB > MIC ,Z)text",
+    "(a,) trailing comma",
+    "no markers at all",
+    "",
+    None,
+    "(Б>Ж) cyrillic codes",
+]
+
+
+@pytest.fixture
+def processor(tmp_path):
+    file_path = tmp_path / "clippings.csv"
+    pd.DataFrame(columns=["location", "date", "highlight_text", "note_text"]).to_csv(
+        file_path, index=False
+    )
+    return ClippingProcessor(file_path)
+
+
+def test_matches_per_note_parsing(processor):
+    df = pd.DataFrame({"note_text": pd.array(NOTES, dtype="string")}, index=range(10, 19))
+    result = processor.categorize_notes(df.copy())
+
+    assert list(result["categories"]) == [processor.extract_categories(note) for note in NOTES]
+    assert [None if pd.isna(note) else note for note in result["note_text"]] == [
+        processor.strip_categories_from_note(note) for note in NOTES
+    ]
+
+
+def test_nested_hierarchies(processor):
+    df = pd.DataFrame({"note_text": ["(P>Custom, W) text", "plain"]})
+    result = processor.categorize_notes(df)
+    assert list(result["categories"]) == [
+        [["Protein", "Custom"], ["Water"]],
+        [["No Category"]],
+    ]
+    assert list(result["note_text"]) == ["text", "plain"]
+
+
+def test_without_any_category(processor):
+    df = pd.DataFrame({"note_text": pd.array([None, "plain"], dtype="string")})
+    assert list(processor.categorize_notes(df)["categories"]) == [[["No Category"]]] * 2
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cli import main_external_csv
+from src.cli.main_external_csv import ClippingProcessor
+
+
+def date(day, hour=0):
+    return f"Sun Feb {day:02d} 2017 {hour:02d}:21:58 GMT+0100 (Central European Standard Time)"
+
+
+def write_rows(tmp_path, rows):
+    file_path = tmp_path / "clippings.csv"
+    pd.DataFrame(rows, columns=["book", "location", "date", "highlight_text", "note_text"]).to_csv(
+        file_path, index=False
+    )
+    return file_path
+
+
+@pytest.mark.parametrize("chunksize", [1, 3, 7, 1000])
+def test_chunked_matches_full(tmp_path, chunksize):
+    rng = np.random.default_rng(chunksize)
+    rows = []
+    for index in range(200):
+        start = int(rng.integers(0, 300))
+        length = int(rng.integers(0, 8))
+        location = str(start) if length == 0 else f"{start}-{start + length}"
+        rows.append(
+            (
+                f"Book {rng.integers(0, 4)}",
+                location,
+                date(int(rng.integers(1, 4)), int(rng.integers(0, 3))),
+                f"text {index}",
+                "",
+            )
+        )
+    file_path = write_rows(tmp_path, rows)
+
+    expected = ClippingProcessor(file_path).remove_duplicates()
+    result = ClippingProcessor(file_path, chunksize=chunksize).remove_duplicates()
+
+    assert list(result.index) == list(expected.index)
+    assert list(result["highlight_text"]) == list(expected["highlight_text"])
+    assert isinstance(result["book"].dtype, pd.CategoricalDtype)
+    assert "location_start" not in result.columns
+
+
+def test_empty_export(tmp_path):
+    file_path = write_rows(tmp_path, [])
+
+    expected = ClippingProcessor(file_path).remove_duplicates()
+    result = ClippingProcessor(file_path, chunksize=2).remove_duplicates()
+
+    assert result.empty
+    assert list(result.columns) == list(expected.columns)
+
+
+def test_overlap_across_chunks_keeps_newest(tmp_path):
+    file_path = write_rows(
+        tmp_path,
+        [
+            ("A", "100-110", date(1), "old", ""),
+            ("B", "100-110", date(1), "other book", ""),
+            ("A", "115-120", date(2), "unrelated", ""),
+            ("A", "105-116", date(3), "bridge", ""),
+        ],
+    )
+    processor = ClippingProcessor(file_path, chunksize=2)
+    assert processor.df is None
+    assert list(processor.remove_duplicates()["highlight_text"]) == ["other book", "bridge"]
+
+
+def test_chunks_sweep_only_reached_spans(tmp_path, monkeypatch):
+    rows = []
+    for index in range(600):
+        # Every fifth highlight overlaps the previous one of its book
+        end = index * 10 + (35 if index % 5 == 0 else 12)
+        rows.append(
+            (f"Book {index % 3}", f"{index * 10}-{end}", date(1 + index % 3), str(index), "")
+        )
+    file_path = write_rows(tmp_path, rows)
+    swept = []
+
+    def newest_cluster_spans(books, *columns):
+        swept.append(len(books))
+        return original(books, *columns)
+
+    original = main_external_csv.newest_cluster_spans
+    monkeypatch.setattr(main_external_csv, "newest_cluster_spans", newest_cluster_spans)
+    result = ClippingProcessor(file_path, chunksize=10).remove_duplicates()
+
+    # Every chunk reaches at most the last span of each book, so the work grows linearly
+    assert len(swept) == 60
+    assert sum(swept) <= len(rows) + 3 * len(swept)
+    monkeypatch.undo()
+    assert list(result.index) == list(ClippingProcessor(file_path).remove_duplicates().index)
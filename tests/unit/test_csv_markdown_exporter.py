@@ -0,0 +1,46 @@
+import pandas as pd
+
+from src.cli.main_external_csv import MarkdownExporter
+
+
+def make_exporter(tmp_path, rows):
+    df = pd.DataFrame(rows, columns=["categories", "highlight_text", "note_text"])
+    return MarkdownExporter(df, tmp_path / "notes.md")
+
+
+def test_category_tree_keeps_first_appearance_order(tmp_path):
+    exporter = make_exporter(
+        tmp_path,
+        [
+            ([["Protein", "Custom"], ["Water"]], "first", "note"),
+            ([["Water"]], "second", pd.NA),
+            ([["Protein"]], "third", ""),
+            ([["Protein", "Custom"]], "fourth", "other"),
+        ],
+    )
+    tree = exporter.build_category_tree()
+
+    assert list(tree) == ["Protein", "Water"]
+    assert list(tree["Protein"]) == ["notes", "Custom"]
+    assert [note["highlight_text"] for note in tree["Protein"]["notes"]] == ["third"]
+    assert [note["highlight_text"] for note in tree["Protein"]["Custom"]["notes"]] == [
+        "first",
+        "fourth",
+    ]
+    assert [note["highlight_text"] for note in tree["Water"]["notes"]] == ["first", "second"]
+
+
+def test_export_writes_nested_headings(tmp_path):
+    exporter = make_exporter(
+        tmp_path,
+        [([["Protein", "Custom"]], "highlight", "note"), ([["No Category"]], "plain", pd.NA)],
+    )
+    exporter.export()
+    assert exporter.output_file.read_text(encoding="utf-8") == (
+        "# Protein\n"
+        "## Custom\n"
+        "* highlight\n"
+        "\n  **Note**: *note*\n"
+        "# No Category\n"
+        "* plain\n"
+    )
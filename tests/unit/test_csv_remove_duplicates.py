@@ -0,0 +1,118 @@
+import pandas as pd
+import pytest
+
+from src.cli.main_external_csv import ClippingProcessor
+
+
+def make_processor(tmp_path, rows, columns=("location", "date", "highlight_text", "note_text")):
+    file_path = tmp_path / "clippings.csv"
+    pd.DataFrame(rows, columns=list(columns)).to_csv(file_path, index=False)
+    return ClippingProcessor(file_path)
+
+
+def date(day):
+    return f"Sun Feb {day:02d} 2017 21:21:58 GMT+0100 (Central European Standard Time)"
+
+
+def test_keeps_newest_of_overlapping(tmp_path):
+    processor = make_processor(
+        tmp_path,
+        [
+            ("100-110", date(1), "old", ""),
+            ("105-115", date(3), "newest", ""),
+            ("200-210", date(2), "other", ""),
+            ("108-112", date(2), "middle", ""),
+        ],
+    )
+    result = processor.remove_duplicates()
+    assert list(result["highlight_text"]) == ["newest", "other"]
+    assert "location_start" not in result.columns
+
+
+def test_adjacent_ranges_are_kept(tmp_path):
+    processor = make_processor(
+        tmp_path,
+        [("100-110", date(1), "a", ""), ("110-120", date(2), "b", ""), ("120", date(3), "c", "")],
+    )
+    assert list(processor.remove_duplicates()["highlight_text"]) == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize(
+    "locations, expected",
+    [
+        # Exact single point duplicates
+        (["100", "100"], ["second"]),
+        # Point inside a range
+        (["95-105", "100"], ["second"]),
+        # Point touching a range boundary
+        (["100-110", "100"], ["first", "second"]),
+    ],
+)
+def test_single_point_locations(tmp_path, locations, expected):
+    processor = make_processor(
+        tmp_path,
+        [
+            (locations[0], date(1), "first", ""),
+            (locations[1], date(2), "second", ""),
+            ("300-310", date(3), "unrelated", ""),
+        ],
+    )
+    assert list(processor.remove_duplicates()["highlight_text"]) == expected + ["unrelated"]
+
+
+def test_equal_dates_keep_first_row(tmp_path):
+    processor = make_processor(
+        tmp_path, [("100-110", date(1), "first", ""), ("100-110", date(1), "second", "")]
+    )
+    assert list(processor.remove_duplicates()["highlight_text"]) == ["first"]
+
+
+def test_duplicates_are_scoped_per_book(tmp_path):
+    processor = make_processor(
+        tmp_path,
+        [
+            ("Book A", "100-110", date(1), "a old", ""),
+            ("Book B", "100-110", date(2), "b", ""),
+            ("Book A", "105-115", date(3), "a new", ""),
+        ],
+        columns=("book", "location", "date", "highlight_text", "note_text"),
+    )
+    assert list(processor.remove_duplicates()["highlight_text"]) == ["b", "a new"]
+
+
+def test_concurrent_matches_serial(tmp_path):
+    rows = [
+        (f"Book {i % 7}", f"{i % 50 * 10}-{i % 50 * 10 + i % 13}", date(i % 28 + 1), str(i), "")
+        for i in range(400)
+    ]
+    columns = ("book", "location", "date", "highlight_text", "note_text")
+    serial = make_processor(tmp_path, rows, columns).remove_duplicates()
+    concurrent = make_processor(tmp_path, rows, columns).remove_duplicates(max_workers=2)
+    pd.testing.assert_frame_equal(serial, concurrent)
+
+
+def test_parse_locations():
+    starts, ends = ClippingProcessor.parse_locations(pd.Series(["100-110", "5", " 7 - 9 "]))
+    assert list(starts) == [100, 5, 7]
+    assert list(ends) == [110, 5, 9]
+    assert starts.dtype == ends.dtype == "int32"
+    with pytest.raises(ValueError, match="page 3"):
+        ClippingProcessor.parse_locations(pd.Series(["1-2", "page 3"]))
+
+
+def test_read_csv_schema(tmp_path):
+    processor = make_processor(
+        tmp_path,
+        [("Book A", "Author", 100, date(1), "text", None)],
+        columns=("book", "author", "location", "date", "highlight_text", "note_text"),
+    )
+    df = processor.df
+    assert isinstance(df["book"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["author"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["highlight_text"].dtype, pd.StringDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df["date"])
+    assert list(processor.remove_duplicates()["highlight_text"]) == ["text"]
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,99 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.cli.main import KindleClippingsProcessor
+
+
+def entry(book, location, text):
+    return (
+        f"{book}\n- Your Highlight on Location {location} | Added on Date\n\n{text}\n"
+        f"{KindleClippingsProcessor.DELIMITER}"
+    )
+
+
+class TestIncrementalProcessing(unittest.TestCase):
+    def setUp(self):
+        """Set up input, output and state paths in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        directory = Path(self.temp_dir.name)
+        self.input_path = directory / "My Clippings.txt"
+        self.output_path = directory / "Cleaned Clippings.txt"
+        self.state_path = directory / "state.json"
+        self.full_output_path = directory / "Full.txt"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def append(self, *entries):
+        with open(self.input_path, "a", encoding="utf-8") as file:
+            file.write("".join(entries))
+
+    def run_incremental(self, format_style="default"):
+        processor = KindleClippingsProcessor(self.input_path)
+        return processor.process_incremental(self.output_path, format_style, self.state_path)
+
+    def assert_matches_full_run(self, format_style="default"):
+        processor = KindleClippingsProcessor(self.input_path)
+        cleaned = processor.remove_duplicates(processor.read_clippings())
+        processor.save_cleaned_clippings(
+            self.full_output_path, processor.apply_formatting(cleaned, format_style)
+        )
+        self.assertEqual(
+            self.output_path.read_text(encoding="utf-8"),
+            self.full_output_path.read_text(encoding="utf-8"),
+        )
+
+    def test_appends_only_new_entries(self):
+        """Test that a second run only processes entries appended after the first one."""
+        self.append(entry("Book A", "100-110", "a"), entry("Book B", "100-110", "b"))
+        self.assertEqual(self.run_incremental(), 2)
+        self.append(entry("Book A", "200-210", "c"), entry("Book A", "205-215", "d"))
+        self.assertEqual(self.run_incremental(), 1)
+        self.assertEqual(self.run_incremental(), 0)
+        self.assert_matches_full_run()
+
+    def test_superseded_highlight_rebuilds(self):
+        """Test that a new highlight overlapping a saved one rebuilds the output."""
+        self.append(entry("Book A", "100-110", "short"), entry("Book B", "100-110", "b"))
+        self.run_incremental()
+        self.append(entry("Book A", "100-120", "longer"))
+        self.assertEqual(self.run_incremental(), 2)
+        self.assert_matches_full_run()
+
+    def test_bullet_output_continues_book(self):
+        """Test that appended bullet points do not repeat the heading of the last book."""
+        self.append(entry("Book A", "100-110", "a"))
+        self.run_incremental("bullet")
+        self.append(entry("Book A", "200-210", "b"), entry("Book B", "100-110", "c"))
+        self.run_incremental("bullet")
+        self.assert_matches_full_run("bullet")
+
+    def test_changed_prefix_rebuilds(self):
+        """Test that a rewritten input file is processed from the start."""
+        self.append(entry("Book A", "100-110", "a"))
+        self.run_incremental()
+        self.input_path.write_text(entry("Book C", "1-5", "c"), encoding="utf-8")
+        self.assertEqual(self.run_incremental(), 1)
+        self.assert_matches_full_run()
+
+    def test_changed_output_rebuilds(self):
+        """Test that an output edited since the previous run is rebuilt from the start."""
+        self.append(entry("Book A", "100-110", "a"))
+        self.run_incremental()
+        self.output_path.write_text("edited\n", encoding="utf-8")
+        self.append(entry("Book B", "100-110", "b"))
+        self.assertEqual(self.run_incremental(), 2)
+        self.assert_matches_full_run()
+
+    def test_incomplete_entry_is_deferred(self):
+        """Test that an entry without its closing delimiter waits for the next run."""
+        self.append(entry("Book A", "100-110", "a"), "Book B\n- Your Highlight on Location 1-2")
+        self.assertEqual(self.run_incremental(), 1)
+        self.append(" | Added on Date\n\nb\n", KindleClippingsProcessor.DELIMITER)
+        self.assertEqual(self.run_incremental(), 1)
+        self.assert_matches_full_run()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import random
+import unittest
+
+from src.cli.main import HighlightIntervalIndex, ranges_overlap
+
+
+class TestHighlightIntervalIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up an index holding a few non-overlapping ranges."""
+        self.index = HighlightIntervalIndex()
+        for highlight_range in [(100, 110), (110, 110), (110, 120), (200, 200), (300, 350)]:
+            self.index.add(highlight_range)
+
+    def test_exact_overlap(self):
+        """Test that an exact match of a stored range is an overlap."""
+        self.assertTrue(self.index.overlaps((100, 110)))
+        self.assertTrue(self.index.overlaps((200, 200)))
+
+    def test_partial_overlap(self):
+        """Test that partial overlaps and encapsulation are found."""
+        self.assertTrue(self.index.overlaps((105, 108)))
+        self.assertTrue(self.index.overlaps((95, 105)))
+        self.assertTrue(self.index.overlaps((190, 210)))
+        self.assertTrue(self.index.overlaps((0, 1000)))
+
+    def test_adjacent_no_overlap(self):
+        """Test that ranges touching stored endpoints are not overlaps."""
+        self.assertFalse(self.index.overlaps((90, 100)))
+        self.assertFalse(self.index.overlaps((120, 130)))
+        self.assertFalse(self.index.overlaps((100, 100)))
+        self.assertFalse(self.index.overlaps((350, 350)))
+
+    def test_matches_pairwise_check(self):
+        """Test that the index agrees with a pairwise overlap check on random ranges."""
+        rng = random.Random(42)
+        index = HighlightIntervalIndex()
+        stored = []
+        for _ in range(2000):
+            start = rng.randint(0, 500)
+            highlight_range = (start, start + rng.choice([0, 0, 1, 2, 5, 10]))
+            expected = any(ranges_overlap(highlight_range, existing) for existing in stored)
+            self.assertEqual(index.overlaps(highlight_range), expected)
+            if not expected:
+                index.add(highlight_range)
+                stored.append(highlight_range)
+        self.assertEqual(sorted(stored), list(index))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.cli.main import KindleClippingsProcessor
+
+ENTRIES = [
+    "Book A (Author)\n- Your Highlight on Location 100-110 | Added on Date\n\nfirst\n",
+    "Book B (Author)\n- Your Note on Location 5 | Added on Date\n\n==========quoted\n",
+    "Book A (Author)\n- Your Highlight on Location 200-210 | Added on Date\n\nsecond\n",
+    "Book C (Author)\n- Your Bookmark on Location 7 | Added on Date\n\n\n",
+]
+
+
+class TestMappedClippings(unittest.TestCase):
+    def setUp(self):
+        """Set up a temporary directory for clippings files."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "My Clippings.txt"
+        self.processor = KindleClippingsProcessor(self.file_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, content, newline="\n"):
+        self.file_path.write_bytes(content.replace("\n", newline).encode("utf-8"))
+
+    def assert_matches_text_reader(self):
+        with self.processor.map_clippings() as clippings:
+            self.assertEqual(list(clippings), self.processor.read_clippings())
+
+    def test_matches_text_reader(self):
+        """Test that mapped clippings equal those read in text mode."""
+        self.write("".join(entry + "==========\n" for entry in ENTRIES))
+        self.assert_matches_text_reader()
+
+    def test_windows_line_endings_and_bom(self):
+        """Test files written with CRLF line endings and a byte order mark."""
+        self.write("\ufeff" + "".join(entry + "==========\n" for entry in ENTRIES), "\r\n")
+        self.assert_matches_text_reader()
+
+    def test_empty_file(self):
+        """Test that an empty file has no clippings."""
+        self.write("")
+        with self.processor.map_clippings() as clippings:
+            self.assertEqual(len(clippings), 0)
+            self.assertEqual(self.processor.list_books(clippings), [])
+
+    def test_list_and_filter_books(self):
+        """Test listing and filtering books from the decoded headers."""
+        self.write("".join(entry + "==========\n" for entry in ENTRIES))
+        with self.processor.map_clippings() as clippings:
+            self.assertEqual(self.processor.list_books(clippings), ["Book A (Author)"])
+            selected = self.processor.filter_clippings_by_book(clippings, "Book A (Author)")
+            self.assertEqual([clipping.body for clipping in selected], ["first", "second"])
+
+
+if __name__ == "__main__":
+    unittest.main()
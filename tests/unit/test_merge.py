@@ -0,0 +1,95 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.cli.main import merge_clippings_files
+
+
+def entry(kind, location, day, text):
+    return (
+        f"Book (Author)\n- Your {kind} on Location {location} | Added on Monday, January {day},"
+        f" 2024 10:00:00 AM\n\n{text}\n==========\n"
+    )
+
+
+def undated_entry(kind, location, text):
+    return (
+        f"Book (Author)\n- Your {kind} on Location {location} | Added on some day\n\n"
+        f"{text}\n==========\n"
+    )
+
+
+class TestMergeClippingsFiles(unittest.TestCase):
+    def setUp(self):
+        """Set up the clippings files of two devices."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.first = self.root / "first.txt"
+        self.second = self.root / "second.txt"
+        self.output_path = self.root / "merged.txt"
+        self.first.write_text(
+            entry("Highlight", "100-110", 1, "a")
+            + entry("Note", "105", 2, "shared note")
+            + entry("Highlight", "300-310", 5, "c"),
+            encoding="utf-8",
+        )
+        self.second.write_text(
+            entry("Highlight", "100-110", 1, "a")
+            + entry("Note", "105", 2, "shared note")
+            + entry("Highlight", "100-120", 3, "a longer")
+            + entry("Highlight", "200-210", 4, "b"),
+            encoding="utf-8",
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_merges_in_timestamp_order(self):
+        """Test that the newest highlight wins across files and output is chronological."""
+        total, kept = merge_clippings_files([self.first, self.second], self.output_path, "bullet")
+        self.assertEqual((total, kept), (7, 4))
+        self.assertEqual(
+            self.output_path.read_text(encoding="utf-8"),
+            "=========== Book (Author) ===========\n* a longer\n* b\n* c\n",
+        )
+
+    def test_shared_notes_kept_once(self):
+        """Test that notes present on both devices are written once."""
+        merge_clippings_files([self.first, self.second], self.output_path, "default")
+        self.assertEqual(self.output_path.read_text(encoding="utf-8").count("shared note"), 1)
+
+    def test_undated_clippings_follow_file_order(self):
+        """Test that clippings without a timestamp take the one of the clipping before them."""
+        self.first.write_text(
+            entry("Highlight", "900-901", 1, "x") + undated_entry("Highlight", "100-110", "old"),
+            encoding="utf-8",
+        )
+        self.second.write_text(
+            entry("Highlight", "800-801", 2, "y") + undated_entry("Highlight", "100-115", "new"),
+            encoding="utf-8",
+        )
+        for input_paths in ([self.first, self.second], [self.second, self.first]):
+            merge_clippings_files(input_paths, self.output_path, "bullet")
+            self.assertEqual(
+                self.output_path.read_text(encoding="utf-8"),
+                "=========== Book (Author) ===========\n* x\n* y\n* new\n",
+            )
+
+    def test_equal_timestamps_keep_file_order(self):
+        """Test that clippings sharing a timestamp keep the order of their file."""
+        self.first.write_text(
+            entry("Highlight", "100-110", 1, "highlight") + entry("Note", "110", 1, "its note"),
+            encoding="utf-8",
+        )
+        self.second.write_text(entry("Highlight", "500-510", 1, "other"), encoding="utf-8")
+        for input_paths, expected in (
+            ([self.first, self.second], ["highlight", "its note", "other"]),
+            ([self.second, self.first], ["other", "highlight", "its note"]),
+        ):
+            merge_clippings_files(input_paths, self.output_path, "default")
+            lines = self.output_path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual([line for line in lines if line in expected], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+
+from src.cli.main import KindleClippingsProcessor
+from src.cli.minhash import MinHashIndex
+
+PASSAGE = (
+    "It is a truth universally acknowledged, that a single man in possession of a good fortune,"
+    " must be in want of a wife."
+)
+
+
+def entry(book, text, kind="Highlight", location="100-110"):
+    return f"{book}\n- Your {kind} on Location {location} | Added on Date\n\n{text}\n"
+
+
+class TestRemoveNearDuplicates(unittest.TestCase):
+    def setUp(self):
+        """Set up a KindleClippingsProcessor instance for testing."""
+        self.processor = KindleClippingsProcessor(None)
+
+    def bodies(self, entries, threshold=0.8):
+        clippings = [self.processor.parse_clipping(e) for e in entries]
+        return [c.body for c in self.processor.remove_near_duplicates(clippings, threshold)]
+
+    def test_other_edition_keeps_latest(self):
+        """Test that a passage highlighted again in another edition keeps the later highlight."""
+        edited = PASSAGE.replace("wife.", "wife!").upper()
+        bodies = self.bodies(
+            [
+                entry("Pride and Prejudice (Austen)", PASSAGE),
+                entry("Pride & Prejudice (Jane Austen)", edited, location="2000-2010"),
+            ]
+        )
+        self.assertEqual(bodies, [edited])
+
+    def test_different_texts_are_kept(self):
+        """Test that unrelated highlights and near-duplicates below the threshold are kept."""
+        other = "The quick brown fox jumps over the lazy dog while the cat sleeps in the sun."
+        shortened = PASSAGE.split(", must")[0]
+        self.assertEqual(
+            self.bodies([entry("A", PASSAGE), entry("B", other), entry("C", shortened)]),
+            [PASSAGE, other, shortened],
+        )
+        self.assertEqual(
+            len(self.bodies([entry("A", PASSAGE), entry("B", PASSAGE + " Yes")], 1)), 2
+        )
+
+    def test_short_texts_and_notes_are_kept(self):
+        """Test that short highlights and notes are never removed."""
+        entries = [
+            entry("A", "Yes, indeed."),
+            entry("B", "Yes, indeed."),
+            entry("A", PASSAGE, kind="Note"),
+            entry("B", PASSAGE, kind="Note"),
+        ]
+        self.assertEqual(len(self.bodies(entries)), 4)
+
+    def test_clusters(self):
+        """Test that near-identical texts share a label and others do not."""
+        index = MinHashIndex(0.5)
+        texts = [PASSAGE, PASSAGE + " And more.", "Completely unrelated words of a sentence here."]
+        labels = index.clusters(texts)
+        self.assertEqual(labels[0], labels[1])
+        self.assertNotEqual(labels[0], labels[2])
+        self.assertEqual(index.clusters([]), [])
+
+    def test_texts_without_words(self):
+        """Test that texts without words are neither clustered nor break the signatures."""
+        index = MinHashIndex()
+        self.assertEqual(index.clusters(["a b c d e f g", ""]), [0, 1])
+        self.assertEqual(index.clusters(["!!!"]), [0])
+        self.assertEqual(index.clusters(["", "...", "a b c", "a b c"]), [0, 1, 3, 3])
+
+    def test_low_thresholds(self):
+        """Test that texts just at a low threshold are clustered and unrelated ones are not."""
+        words = PASSAGE.split()
+        for threshold in (0.3, 0.5, 0.8):
+            with self.subTest(threshold=threshold):
+                index = MinHashIndex(threshold)
+                kept = len(words)
+                edited = words
+                while True:
+                    candidate = edited[: kept - 1] + ["changed"] + edited[kept:]
+                    first, second = index.shingles(PASSAGE), index.shingles(" ".join(candidate))
+                    if len(first & second) / len(first | second) < threshold:
+                        break
+                    edited, kept = candidate, kept - 1
+                labels = index.clusters([PASSAGE, " ".join(edited), "Nothing alike at all here."])
+                self.assertEqual(labels[0], labels[1])
+                self.assertNotEqual(labels[0], labels[2])
+
+    def test_threshold_range(self):
+        """Test that thresholds outside (0, 1] are rejected."""
+        for threshold in (0, -0.5, 1.5):
+            with self.subTest(threshold=threshold):
+                with self.assertRaises(ValueError):
+                    MinHashIndex(threshold)
+
+
+if __name__ == "__main__":
+    unittest.main()
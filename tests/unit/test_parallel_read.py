@@ -0,0 +1,63 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.cli.main import KindleClippingsProcessor
+
+ENTRIES = [
+    "Book A (Author)\n- Your Highlight on Location 100-110 | Added on Date\n\nfirst\n",
+    "Book B (Author)\n- Your Note on Location 5 | Added on Date\n\n==========quoted\n",
+    "Book A (Author)\n- Your Highlight on Location 200-210 | Added on Date\n\nsecond ✓\n",
+    "Book C (Author)\n- Your Bookmark on Location 7 | Added on Date\n\n\n",
+]
+
+
+class TestParallelRead(unittest.TestCase):
+    def setUp(self):
+        """Set up a processor that reads even small files in parallel."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "My Clippings.txt"
+        self.processor = KindleClippingsProcessor(self.file_path)
+        self.processor.PARALLEL_MIN_SIZE = 0
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, content, newline="\n"):
+        self.file_path.write_bytes(content.replace("\n", newline).encode("utf-8"))
+
+    def test_byte_ranges_end_on_delimiters(self):
+        """Test that the byte ranges cover the file and end right after a delimiter line."""
+        self.write("".join(entry + "==========\n" for entry in ENTRIES * 5), "\r\n")
+        byte_ranges = self.processor._split_byte_ranges(4)
+        data = self.file_path.read_bytes()
+
+        self.assertEqual(len(byte_ranges), 4)
+        self.assertEqual(byte_ranges[0][0], 0)
+        self.assertEqual(byte_ranges[-1][1], len(data))
+        for (_, end), (start, _) in zip(byte_ranges, byte_ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertTrue(data[:end].endswith(b"==========\r\n"))
+
+    def test_matches_sequential_reader(self):
+        """Test that parallel parsing returns the clippings of the text reader in order."""
+        for newline in ["\n", "\r\n"]:
+            with self.subTest(newline=newline):
+                self.write("\ufeff" + "".join(e + "==========\n" for e in ENTRIES * 10), newline)
+                self.assertEqual(
+                    self.processor.read_clippings_parallel(3), self.processor.read_clippings()
+                )
+
+    def test_more_workers_than_entries(self):
+        """Test a file with fewer entries than workers and no trailing delimiter."""
+        self.write(ENTRIES[0] + "==========\n" + ENTRIES[2])
+        self.assertEqual(self.processor.read_clippings_parallel(8), self.processor.read_clippings())
+
+    def test_empty_file(self):
+        """Test that an empty file has no clippings."""
+        self.write("")
+        self.assertEqual(self.processor.read_clippings_parallel(2), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
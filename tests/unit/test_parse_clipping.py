@@ -0,0 +1,115 @@
+import unittest
+from datetime import datetime
+
+from src.cli.main import KindleClippingsProcessor
+
+
+class TestParseClipping(unittest.TestCase):
+    def setUp(self):
+        """Set up a KindleClippingsProcessor instance for testing."""
+        self.processor = KindleClippingsProcessor(None)
+
+    def test_highlight(self):
+        """Test parsing a highlight with page, location and timestamp."""
+        entry = (
+            "\ufeffThinking (Series 1) (Author A)\n- Your Highlight on page 12 | Location 100-110"
+            " | Added on Sunday, February 5, 2017 9:21:58 PM\n\nSome text\n"
+        )
+        clipping = self.processor.parse_clipping(entry)
+        self.assertEqual(clipping.title, "Thinking (Series 1)")
+        self.assertEqual(clipping.author, "Author A")
+        self.assertEqual(clipping.book_title, "Thinking (Series 1) (Author A)")
+        self.assertEqual(clipping.kind, KindleClippingsProcessor.HIGHLIGHT)
+        self.assertEqual(clipping.location, (100, 110))
+        self.assertEqual(clipping.page, "12")
+        self.assertEqual(clipping.added_on, datetime(2017, 2, 5, 21, 21, 58))
+        self.assertEqual(clipping.body, "Some text")
+        self.assertEqual(clipping.raw, entry)
+
+    def test_english_date_forms(self):
+        """Test parsing month-first and day-first English timestamps."""
+        cases = {
+            "Sunday, February 5, 2017 9:21:58 PM": datetime(2017, 2, 5, 21, 21, 58),
+            "Saturday, 6 June 2020 14:50:13": datetime(2020, 6, 6, 14, 50, 13),
+            "Saturday, 6 June 2020 02:50:13 PM": datetime(2020, 6, 6, 14, 50, 13),
+        }
+        for added_on, expected in cases.items():
+            with self.subTest(added_on=added_on):
+                clipping = self.processor.parse_clipping(
+                    f"Book\n- Your Highlight on Location 1-2 | Added on {added_on}\n\ntext\n"
+                )
+                self.assertEqual(clipping.added_on, expected)
+
+    def test_note_and_bookmark(self):
+        """Test parsing notes and bookmarks with a single location."""
+        note = self.processor.parse_clipping(
+            "Book\n- Your Note on Location 100 | Added on Date\n\nnote text\n"
+        )
+        bookmark = self.processor.parse_clipping(
+            "Book\n- Your Bookmark on Location 200 | Added on Date\n\n\n"
+        )
+        self.assertEqual((note.kind, note.location, note.body), ("note", (100, 100), "note text"))
+        self.assertEqual(
+            (bookmark.kind, bookmark.location, bookmark.body), ("bookmark", (200, 200), "")
+        )
+        self.assertEqual(note.book_title, "Book")
+        self.assertIsNone(note.added_on)
+
+    def test_without_location(self):
+        """Test parsing a clipping that only has a page number."""
+        clipping = self.processor.parse_clipping(
+            "Book (Author)\n- Your Highlight on page 7 | Added on Date\n\ntext\n"
+        )
+        self.assertIsNone(clipping.location)
+        self.assertEqual(clipping.page, "7")
+
+    def test_location_forms(self):
+        """Test parsing full, single and shortened location ranges from the metadata line."""
+        cases = {
+            "Location 100-110": (100, 110),
+            "Location 100": (100, 100),
+            "page 12 | Location 1234-56": (1234, 1256),
+            "Location 1298-02": (1298, 1302),
+            "Location 99-105": (99, 105),
+        }
+        for location, expected in cases.items():
+            with self.subTest(location=location):
+                clipping = self.processor.parse_clipping(
+                    f"Book\n- Your Highlight on {location} | Added on Date\n\nLocation 1-2\n"
+                )
+                self.assertEqual(clipping.location, expected)
+
+    def test_locales(self):
+        """Test parsing metadata lines written by Kindles set to other languages."""
+        cases = {
+            "- Ihre Markierung auf Seite 12 | Position 100-110 | Hinzugefügt am Sonntag,"
+            " 5. Februar 2017 21:21:58": "de",
+            "- Tu subrayado en la página 12 | posición 100-110 | Añadido el domingo, 5 de"
+            " febrero de 2017 21:21:58": "es",
+            "- Votre surlignement sur la page 12 | emplacement 100-110 | Ajouté le dimanche"
+            " 5 février 2017 21:21:58": "fr",
+            "- 12ページ|位置No. 100-110のハイライト |作成日: 2017年2月5日日曜日 21:21:58": "ja",
+        }
+        for metadata, name in cases.items():
+            with self.subTest(locale=name):
+                processor = KindleClippingsProcessor(None)
+                clipping = processor.parse_clipping(f"Buch\n{metadata}\n\nText\n")
+                self.assertEqual(processor.locale.name, name)
+                self.assertEqual(clipping.kind, KindleClippingsProcessor.HIGHLIGHT)
+                self.assertEqual((clipping.location, clipping.page), ((100, 110), "12"))
+                self.assertEqual(clipping.added_on, datetime(2017, 2, 5, 21, 21, 58))
+
+    def test_detect_locale(self):
+        """Test that the locale matching most entries wins and English is the fallback."""
+        entries = [
+            "Buch\n- Ihre Notiz auf Position 100 | Hinzugefügt am Date\n\nText\n",
+            "Buch\n- Ihr Lesezeichen auf Position 200 | Hinzugefügt am Date\n\n\n",
+            "Book\n- Your Highlight on Location 100-110 | Added on Date\n\nText\n",
+        ]
+        self.assertEqual(self.processor.detect_locale(entries).name, "de")
+        self.assertEqual(self.processor.detect_locale(["Book\n- unknown\n\n"]).name, "en")
+        self.assertEqual(self.processor.detect_locale([]).name, "en")
+
+
+if __name__ == "__main__":
+    unittest.main()
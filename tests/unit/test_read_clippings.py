@@ -0,0 +1,49 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.cli.main import KindleClippingsProcessor
+
+
+class TestIterEntries(unittest.TestCase):
+    def setUp(self):
+        """Write a small clippings file to a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "My Clippings.txt"
+        self.entries = [
+            f"Book {i} (Author)\n- Your Highlight on Location {i}0-{i}5 | Added on Date\n\ntext\n"
+            for i in range(1, 6)
+        ]
+        self.file_path.write_text(
+            "".join(entry + KindleClippingsProcessor.DELIMITER for entry in self.entries),
+            encoding="utf-8",
+        )
+        self.processor = KindleClippingsProcessor(self.file_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_yields_one_entry_per_delimiter(self):
+        """Test that every delimited entry is yielded in file order."""
+        self.assertEqual(list(self.processor.iter_entries()), self.entries)
+
+    def test_entries_spanning_chunks(self):
+        """Test that entries split across read chunks are reassembled."""
+        self.processor.CHUNK_SIZE = 7
+        self.assertEqual(list(self.processor.iter_entries()), self.entries)
+
+    def test_trailing_entry_without_delimiter(self):
+        """Test that a final entry without a closing delimiter is still yielded."""
+        with open(self.file_path, "a", encoding="utf-8") as file:
+            file.write("Last Book\n- Your Note on Location 1 | Added on Date\n\nnote")
+        entries = list(self.processor.iter_entries())
+        self.assertEqual(len(entries), 6)
+        self.assertTrue(entries[-1].endswith("note"))
+
+    def test_read_clippings_matches_iterator(self):
+        """Test that read_clippings returns the same entries as the iterator."""
+        self.assertEqual(self.processor.read_clippings(), list(self.processor.iter_clippings()))
+
+
+if __name__ == "__main__":
+    unittest.main()
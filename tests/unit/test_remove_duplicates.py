@@ -8,12 +8,17 @@ class TestRemoveDuplicates(unittest.TestCase):
         """Set up a KindleClippingsProcessor instance for testing."""
         self.processor = KindleClippingsProcessor(None)
 
+    def parse(self, entries):
+        """Parse raw entries into clipping records."""
+        return [self.processor.parse_clipping(entry) for entry in entries]
+
     def test_no_duplicates(self):
         """Test with no overlapping highlights."""
         clippings = [
             "Test Book (Author A)\n- Your Highlight on Location 100-110 | Added on Date\n\ncontent",
             "Test Book (Author A)\n- Your Highlight on Location 200-210 | Added on Date\n\ncontent",
         ]
+        clippings = self.parse(clippings)
         result = self.processor.remove_duplicates(clippings)
         self.assertEqual(len(result), 2)
         self.assertIn(clippings[0], result)
@@ -25,6 +30,7 @@ class TestRemoveDuplicates(unittest.TestCase):
             "Test Book (Author A)\n- Your Highlight on Location 100-110 | Added on Date\n\ncontent",
             "Test Book (Author A)\n- Your Highlight on Location 100-110 | Added on Date\n\ncontent",
         ]
+        clippings = self.parse(clippings)
         result = self.processor.remove_duplicates(clippings)
         self.assertEqual(len(result), 1)
         self.assertIn(clippings[1], result)
@@ -38,6 +44,7 @@ class TestRemoveDuplicates(unittest.TestCase):
                 " Date\n\nlonger content"
             ),
         ]
+        clippings = self.parse(clippings)
         result = self.processor.remove_duplicates(clippings)
         self.assertEqual(len(result), 1)
         self.assertIn(clippings[1], result)
@@ -48,6 +55,7 @@ class TestRemoveDuplicates(unittest.TestCase):
             "Test Book (Author A)\n- Your Note on Location 100 | Added on Date\n\ncontent",
             "Test Book (Author A)\n- Your Bookmark on Location 200 | Added on Date\n\ncontent",
         ]
+        clippings = self.parse(clippings)
         result = self.processor.remove_duplicates(clippings)
         self.assertEqual(len(result), 2)
         self.assertIn(clippings[0], result)
@@ -67,6 +75,7 @@ class TestRemoveDuplicates(unittest.TestCase):
                 " Date\n\nlonger content"
             ),
         ]
+        clippings = self.parse(clippings)
         result = self.processor.remove_duplicates(clippings)
         self.assertEqual(len(result), 3)
         self.assertIn(clippings[1], result)
@@ -85,6 +94,7 @@ class TestRemoveDuplicates(unittest.TestCase):
                 " Date\nContent B"
             ),
         ]
+        clippings = self.parse(clippings)
         result = self.processor.remove_duplicates(clippings)
         self.assertEqual(len(result), 2)
         self.assertIn(clippings[0], result)
@@ -97,6 +107,7 @@ class TestRemoveDuplicates(unittest.TestCase):
             "Test Book (Author A)\n- Your Highlight on Location 110-115 | Added on Date\nContent B",
             "Test Book (Author A)\n- Your Highlight on Location 115-120 | Added on Date\nContent C",
         ]
+        clippings = self.parse(clippings)
         result = self.processor.remove_duplicates(clippings)
         self.assertEqual(len(result), 3)
         self.assertIn(clippings[0], result)
@@ -0,0 +1,47 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.cli.stage_timer import StageTimer, profiled
+
+
+class TestStageTimer(unittest.TestCase):
+    def test_records_stages(self):
+        """Test that stages are recorded in order with their item counts."""
+        timer = StageTimer()
+        with timer.stage("read", 3):
+            sum(range(1000))
+        with timer.stage("dedup") as stage:
+            stage.items = 2
+
+        self.assertEqual([(s.name, s.items) for s in timer.stages], [("read", 3), ("dedup", 2)])
+        self.assertTrue(all(s.wall_seconds >= 0 and s.cpu_seconds >= 0 for s in timer.stages))
+
+    def test_records_failed_stage(self):
+        """Test that a stage raising an exception is still recorded."""
+        timer = StageTimer()
+        with self.assertRaises(ValueError):
+            with timer.stage("read"):
+                raise ValueError
+        self.assertEqual(len(timer.stages), 1)
+
+    def test_writes_json_and_profile(self):
+        """Test writing the timings as JSON and dumping profiler stats."""
+        timer = StageTimer()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            json_path = Path(temp_dir) / "timings.json"
+            profile_path = Path(temp_dir) / "run.prof"
+            with profiled(profile_path):
+                with timer.stage("read", 1):
+                    pass
+            timer.report(json_path)
+
+            stages = json.loads(json_path.read_text())
+            self.assertEqual(stages[0]["stage"], "read")
+            self.assertIn("peak_child_rss_bytes", stages[0])
+            self.assertTrue(profile_path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from src.cli.main import KindleClippingsProcessor
+
+
+class TestTitleIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up parsed clippings of a few books."""
+        self.processor = KindleClippingsProcessor(None)
+        self.clippings = [
+            self.processor.parse_clipping(f"{book}\n- Your {kind} | Added on Date\n\n{body}\n")
+            for book, kind, body in [
+                ("Book A (Author)", "Highlight on Location 1-2", "a"),
+                ("Book B (Author)", "Highlight on Location 1-2", "Book A (Author)"),
+                ("Book C (Author)", "Note on Location 3", "note"),
+                ("Book A (Author)", "Bookmark on Location 9", ""),
+            ]
+        ]
+        self.title_index = self.processor.build_title_index(self.clippings)
+
+    def test_list_books(self):
+        """Test that only books with highlights are listed."""
+        self.assertEqual(
+            self.processor.list_books(self.clippings, self.title_index),
+            ["Book A (Author)", "Book B (Author)"],
+        )
+
+    def test_filter_by_book(self):
+        """Test that filtering returns the book's clippings in order, ignoring quoted titles."""
+        selected = self.processor.filter_clippings_by_book(
+            self.clippings, "Book A (Author)", self.title_index
+        )
+        self.assertEqual(selected, [self.clippings[0], self.clippings[3]])
+
+    def test_matches_scan(self):
+        """Test that indexed results equal a full scan."""
+        for book_title in ["Book A (Author)", "Book B (Author)", "Book C (Author)", "Missing"]:
+            self.assertEqual(
+                self.processor.filter_clippings_by_book(
+                    self.clippings, book_title, self.title_index
+                ),
+                self.processor.filter_clippings_by_book(self.clippings, book_title),
+            )
+        self.assertEqual(
+            self.processor.list_books(self.clippings, self.title_index),
+            self.processor.list_books(self.clippings),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.cli.main import KindleClippingsProcessor
+
+
+class TestWriteClippings(unittest.TestCase):
+    def setUp(self):
+        """Set up a processor with a few parsed clippings and a temporary output path."""
+        self.processor = KindleClippingsProcessor(None)
+        self.clippings = [
+            self.processor.parse_clipping(
+                f"{book}\n- Your {kind} on Location {location} | Added on Date\n\n{text}\n"
+            )
+            for book, kind, location, text in [
+                ("Book A", "Highlight", "100-110", "first"),
+                ("Book A", "Note", "110", "a note"),
+                ("Book A", "Highlight", "200-210", "second\nline"),
+                ("Book B (Author)", "Highlight", "10-20", "third"),
+            ]
+        ]
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_path = Path(self.temp_dir.name) / "Cleaned Clippings.txt"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_default_format(self):
+        """Test that the default format writes every entry followed by the delimiter."""
+        self.processor.write_clippings(self.output_path, self.clippings, "default")
+        self.assertEqual(
+            self.output_path.read_text(encoding="utf-8"),
+            "".join(c.raw + KindleClippingsProcessor.DELIMITER for c in self.clippings),
+        )
+
+    def test_bullet_format(self):
+        """Test that the bullet format groups highlights under book headings."""
+        self.processor.write_clippings(self.output_path, self.clippings, "bullet")
+        self.assertEqual(
+            self.output_path.read_text(encoding="utf-8"),
+            "=========== Book A ===========\n"
+            "* first\n"
+            "* secondline\n"
+            "=========== Book B (Author) ===========\n"
+            "* third\n",
+        )
+
+    def test_small_buffer_and_batches(self):
+        """Test that the output does not depend on the buffer or batch size."""
+        self.processor.WRITE_BATCH_SIZE = 1
+        self.processor.write_clippings(self.output_path, self.clippings, "bullet", buffer_size=1)
+        expected = "".join(self.processor.apply_formatting(self.clippings, "bullet"))
+        self.assertEqual(self.output_path.read_text(encoding="utf-8"), expected)
+
+    def test_append_continues_book(self):
+        """Test that appending with the current book title does not repeat its heading."""
+        self.processor.write_clippings(self.output_path, self.clippings[:1], "bullet")
+        self.processor.write_clippings(
+            self.output_path, self.clippings[1:], "bullet", "Book A", append=True
+        )
+        self.assertEqual(self.output_path.read_text(encoding="utf-8").count("Book A"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()